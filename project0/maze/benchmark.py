@@ -0,0 +1,225 @@
+"""
+Benchmarks every Maze solver strategy on generated mazes.
+
+Mazes are generated from a seed, so runs on different commits see the same
+inputs. Each run records load and solve wall time, peak traced memory,
+states explored and path length, and the report is written as JSON or CSV
+depending on the output file's extension.
+"""
+
+import argparse
+import csv
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from maze import Maze
+
+
+STRATEGIES = ["dfs", "bfs", "greedy", "astar", "jps", "bidirectional", "wavefront"]
+
+FIELDS = [
+    "commit", "generator", "size", "seed", "strategy", "status",
+    "load_seconds", "solve_seconds", "peak_bytes", "num_explored", "path_length",
+]
+
+
+def backtracker(size, rng):
+    """Returns a perfect maze carved by a randomized depth-first search."""
+    walls = [[True] * size for _ in range(size)]
+    walls[1][1] = False
+    stack = [(1, 1)]
+    while stack:
+        row, col = stack[-1]
+        options = [
+            (dr, dc) for dr, dc in ((-2, 0), (2, 0), (0, -2), (0, 2))
+            if 0 < row + dr < size - 1 and 0 < col + dc < size - 1
+            and walls[row + dr][col + dc]
+        ]
+        if not options:
+            stack.pop()
+            continue
+        dr, dc = rng.choice(options)
+        walls[row + dr // 2][col + dc // 2] = False
+        walls[row + dr][col + dc] = False
+        stack.append((row + dr, col + dc))
+    return walls
+
+
+def prim(size, rng):
+    """Returns a perfect maze grown by randomized Prim's algorithm."""
+    walls = [[True] * size for _ in range(size)]
+
+    def add_edges(row, col):
+        for dr, dc in ((-2, 0), (2, 0), (0, -2), (0, 2)):
+            if 0 < row + dr < size - 1 and 0 < col + dc < size - 1:
+                edges.append((row, col, dr, dc))
+
+    walls[1][1] = False
+    edges = []
+    add_edges(1, 1)
+    while edges:
+        # Swap a random edge to the end so removing it is O(1)
+        i = rng.randrange(len(edges))
+        edges[i], edges[-1] = edges[-1], edges[i]
+        row, col, dr, dc = edges.pop()
+        if walls[row + dr][col + dc]:
+            walls[row + dr // 2][col + dc // 2] = False
+            walls[row + dr][col + dc] = False
+            add_edges(row + dr, col + dc)
+    return walls
+
+
+def rooms(size, rng, room=12, obstacles=0.08):
+    """Returns open rooms joined by doors, with scattered obstacles."""
+    walls = [[rng.random() < obstacles for _ in range(size)] for _ in range(size)]
+    for i in range(size):
+        walls[0][i] = walls[size - 1][i] = True
+        walls[i][0] = walls[i][size - 1] = True
+
+    # Room walls every `room` cells, with a two-cell door into each room
+    for line in range(room, size - 1, room):
+        for start in range(1, size - 1, room):
+            # A segment of one cell (start == size - 2) is all door
+            door = rng.randrange(start, max(start + 1, min(start + room, size - 2)))
+            for i in range(start, min(start + room, size - 1)):
+                open_cell = i in (door, door + 1)
+                walls[line][i] = not open_cell
+                walls[i][line] = not open_cell
+    return walls
+
+
+GENERATORS = {
+    "backtracker": backtracker,
+    "prim": prim,
+    "rooms": rooms,
+}
+
+
+def generate(generator, size, seed):
+    """Returns the text of a generated maze, with A and B in opposite corners."""
+    # Perfect maze generators need odd dimensions
+    size = max(size, 5) | 1
+    walls = GENERATORS[generator](size, random.Random(seed))
+    walls[1][1] = False
+    walls[size - 2][size - 2] = False
+    lines = ["".join("#" if wall else " " for wall in row) for row in walls]
+    lines[1] = "#A" + lines[1][2:]
+    lines[size - 2] = lines[size - 2][:size - 2] + "B#"
+    return "\n".join(lines) + "\n"
+
+
+def run(filename, strategy):
+    """Loads and solves one maze, returning the timings and search counts."""
+    compact = strategy == "wavefront"
+    started = time.perf_counter()
+    maze = Maze(filename, compact=compact)
+    loaded = time.perf_counter()
+    try:
+        maze.solve(strategy)
+        status = "solved"
+    except Exception as e:
+        if str(e) != "no solution":
+            raise
+        status = "no solution"
+    solved = time.perf_counter()
+    return {
+        "status": status,
+        "load_seconds": round(loaded - started, 6),
+        "solve_seconds": round(solved - loaded, 6),
+        "num_explored": maze.num_explored,
+        "path_length": len(maze.solution[0]) if maze.solution else None,
+    }
+
+
+def peak_memory(filename, strategy):
+    """Returns the peak traced memory of loading and solving one maze."""
+    tracemalloc.start()
+    try:
+        run(filename, strategy)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def current_commit():
+    """Returns the checked out git commit, or None outside a repository."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def benchmark(generators, sizes, seeds, strategies, memory=True):
+    """Runs every strategy on every generated maze, yielding one row per run."""
+    commit = current_commit()
+    with tempfile.TemporaryDirectory() as directory:
+        for generator in generators:
+            for size in sizes:
+                for seed in seeds:
+                    filename = os.path.join(directory, f"{generator}-{size}-{seed}.txt")
+                    with open(filename, "w") as f:
+                        f.write(generate(generator, size, seed))
+                    for strategy in strategies:
+                        row = {
+                            "commit": commit,
+                            "generator": generator,
+                            "size": size,
+                            "seed": seed,
+                            "strategy": strategy,
+                        }
+                        row.update(run(filename, strategy))
+                        row["peak_bytes"] = (
+                            peak_memory(filename, strategy) if memory else None
+                        )
+                        yield row
+
+
+def write_report(rows, filename):
+    """Writes rows to filename as CSV if it ends in .csv, otherwise JSON."""
+    if filename.endswith(".csv"):
+        with open(filename, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+    else:
+        with open(filename, "w") as f:
+            json.dump(rows, f, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark maze solvers.")
+    parser.add_argument("--generators", nargs="+", default=list(GENERATORS),
+                        choices=list(GENERATORS))
+    parser.add_argument("--sizes", nargs="+", type=int, default=[51, 101, 201])
+    parser.add_argument("--seeds", nargs="+", type=int, default=[0])
+    parser.add_argument("--strategies", nargs="+", default=STRATEGIES,
+                        choices=STRATEGIES)
+    parser.add_argument("--no-memory", dest="memory", action="store_false",
+                        help="skip the second, traced run that measures memory")
+    parser.add_argument("--output", default="benchmark.json",
+                        help="report file, .json or .csv")
+    args = parser.parse_args()
+
+    rows = []
+    for row in benchmark(args.generators, args.sizes, args.seeds,
+                         args.strategies, args.memory):
+        rows.append(row)
+        print(f"{row['generator']:>11} {row['size']:>6} seed {row['seed']:<3} "
+              f"{row['strategy']:>13}: {row['solve_seconds']:9.4f}s "
+              f"{row['num_explored']:>9} explored  {row['status']}",
+              file=sys.stderr)
+    write_report(rows, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,30 @@
+import heapq
+import itertools
+import math
+import os
 import sys
+from collections import deque
 
 class Node():
-    def __init__(self, state, parent, action):
+    def __init__(self, state, parent, action, cost=0):
         self.state = state
         self.parent = parent
         self.action = action
+        self.cost = cost
 
 
 class StackFrontier():
     def __init__(self):
-        self.frontier = []
+        self.frontier = deque()
+        # States currently queued, so membership checks don't scan the frontier
+        self.states = set()
 
     def add(self, node):
         self.frontier.append(node)
+        self.states.add(node.state)
 
     def contains_state(self, state):
-        return any(node.state == state for node in self.frontier)
+        return state in self.states
 
     def empty(self):
         return len(self.frontier) == 0
@@ -24,8 +33,8 @@ class StackFrontier():
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[-1]
-            self.frontier = self.frontier[:-1]
+            node = self.frontier.pop()
+            self.states.discard(node.state)
             return node
 
 
@@ -35,13 +44,99 @@ class QueueFrontier(StackFrontier):
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[0]
-            self.frontier = self.frontier[1:]
+            node = self.frontier.popleft()
+            self.states.discard(node.state)
             return node
 
+
+class PriorityFrontier():
+    def __init__(self, priority):
+        # priority(node) gives the sort key; lowest key is removed first
+        self.priority = priority
+        self.frontier = []
+        self.counter = itertools.count()
+        # Best queued node per state; heap entries for replaced nodes are stale
+        self.nodes = {}
+
+    def add(self, node):
+        key = self.priority(node)
+        queued = self.nodes.get(node.state)
+        if queued is not None and self.priority(queued) <= key:
+            return
+        self.nodes[node.state] = node
+        heapq.heappush(self.frontier, (key, next(self.counter), node))
+
+    def contains_state(self, state):
+        return state in self.nodes
+
+    def empty(self):
+        return len(self.nodes) == 0
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        while True:
+            _, _, node = heapq.heappop(self.frontier)
+            if self.nodes.get(node.state) is node:
+                del self.nodes[node.state]
+                return node
+
+
+def manhattan(state, goal):
+    """Manhattan distance, exact on an open 4-connected grid."""
+    return abs(state[0] - goal[0]) + abs(state[1] - goal[1])
+
+
+def octile(state, goal):
+    """Octile distance; admissible for 4- and 8-connected grids."""
+    dr = abs(state[0] - goal[0])
+    dc = abs(state[1] - goal[1])
+    return max(dr, dc) + (math.sqrt(2) - 1) * min(dr, dc)
+
+
+# Row and column step for each action
+JUMPS = {
+    "up": (-1, 0),
+    "down": (1, 0),
+    "left": (0, -1),
+    "right": (0, 1),
+}
+
+
+HEURISTICS = {
+    "manhattan": manhattan,
+    "octile": octile,
+}
+
+
+class CellMask():
+    """Set-like view of the cells marked True in a 2D boolean array."""
+
+    def __init__(self, mask):
+        self.mask = mask
+
+    def __contains__(self, state):
+        row, col = state
+        height, width = self.mask.shape
+        return 0 <= row < height and 0 <= col < width and bool(self.mask[row, col])
+
+    def __len__(self):
+        return int(self.mask.sum())
+
+    def __iter__(self):
+        for row, col in zip(*self.mask.nonzero()):
+            yield (int(row), int(col))
+
+
 class Maze():
 
-    def __init__(self, filename):
+    def __init__(self, filename, compact=False):
+
+        # Keep walls in a numpy array instead of nested lists
+        if compact:
+            self.read_compact(filename)
+            self.solution = None
+            return
 
         # Read file and set height and width of maze
         with open(filename) as f:
@@ -81,6 +176,69 @@ class Maze():
         self.solution = None
 
 
+    def read_compact(self, filename, chunk_size=1 << 24):
+        """Reads an ASCII maze file into a 2D numpy bool array of walls.
+
+        The file is memory-mapped: one chunked pass finds line breaks, start
+        and goal, and a second fills the walls row by row. Apart from the
+        walls (one byte per cell) only chunk-sized temporaries are allocated.
+        """
+        import mmap
+        import numpy as np
+
+        with open(filename, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                raise Exception("maze must have exactly one start point")
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        # The mapping is released once the last view of it goes away
+        buffer = np.frombuffer(data, dtype=np.uint8)
+        del data
+
+        # Locate line breaks, start and goal in a single pass
+        ends, starts, goals = [], [], []
+        for offset in range(0, buffer.size, chunk_size):
+            chunk = buffer[offset:offset + chunk_size]
+            ends.append(np.flatnonzero(chunk == ord("\n")) + offset)
+            starts.append(np.flatnonzero(chunk == ord("A")) + offset)
+            goals.append(np.flatnonzero(chunk == ord("B")) + offset)
+        starts = np.concatenate(starts)
+        goals = np.concatenate(goals)
+
+        # Validate start and goal
+        if starts.size != 1:
+            raise Exception("maze must have exactly one start point")
+        if goals.size != 1:
+            raise Exception("maze must have exactly one goal")
+
+        # A final line without a trailing newline still counts
+        if buffer[-1] != ord("\n"):
+            ends.append(np.array([buffer.size]))
+        ends = np.concatenate(ends)
+        begins = np.concatenate(([0], ends[:-1] + 1))
+        lengths = ends - begins
+        lengths -= (lengths > 0) & (buffer[np.maximum(ends - 1, 0)] == ord("\r"))
+
+        # Determine height and width of maze
+        self.height = len(ends)
+        self.width = int(lengths.max())
+
+        def locate(position):
+            row = int(np.searchsorted(ends, position))
+            return (row, int(position - begins[row]))
+
+        self.start = locate(starts[0])
+        self.goal = locate(goals[0])
+
+        # Short lines are padded with open cells
+        self.walls = np.zeros((self.height, self.width), dtype=bool)
+        for i in range(self.height):
+            line = buffer[begins[i]:begins[i] + lengths[i]]
+            np.not_equal(line, ord(" "), out=self.walls[i, :lengths[i]])
+        self.walls[self.start] = False
+        self.walls[self.goal] = False
+
+
     def print(self):
         solution = self.solution[1] if self.solution is not None else None
         print()
@@ -116,17 +274,62 @@ class Maze():
         return result
 
 
-    def solve(self):
-        """Finds a solution to maze, if one exists."""
+    def frontier(self, strategy, heuristic, goal):
+        """Returns an empty frontier implementing the search strategy."""
+        if strategy == "dfs":
+            return StackFrontier()
+        if strategy == "bfs":
+            return QueueFrontier()
+        if strategy == "greedy":
+            return PriorityFrontier(
+                lambda node: heuristic(node.state, goal)
+            )
+        if strategy == "astar":
+            # Break f ties towards deeper nodes, which are closer to the goal
+            return PriorityFrontier(
+                lambda node: (node.cost + heuristic(node.state, goal),
+                              -node.cost)
+            )
+        raise ValueError(f"unknown strategy {strategy!r}")
+
+
+    def solve(self, strategy="dfs", heuristic=manhattan):
+        """Finds a solution to maze, if one exists.
+
+        strategy is one of "dfs", "bfs", "greedy", "astar", "jps",
+        "bidirectional" or "wavefront" (array-based BFS, needs numpy);
+        heuristic estimates the distance between two cells and is only used
+        by the informed strategies.
+        """
+        if strategy == "wavefront":
+            return self.solve_wavefront()
+        if strategy == "bidirectional":
+            return self.solve_bidirectional()
+        if strategy == "jps":
+            return self.solve_jps(heuristic)
+        self.solution = self.search(self.start, self.goal, strategy, heuristic)
+
+
+    def search(self, source, target, strategy="dfs", heuristic=manhattan):
+        """Returns a solution (actions, cells) leading from source to target.
+
+        Uses one of the frontier-based strategies accepted by solve, and
+        raises an exception if there is no path.
+        """
+        if isinstance(heuristic, str):
+            heuristic = HEURISTICS[heuristic]
 
         # Keep track of number of states explored
         self.num_explored = 0
 
         # Initialize frontier to just the starting position
-        start = Node(state=self.start, parent=None, action=None)
-        frontier = StackFrontier() #QueueFrontier()
+        start = Node(state=source, parent=None, action=None)
+        frontier = self.frontier(strategy, heuristic, target)
         frontier.add(start)
 
+        # A* may find a cheaper route to a state that is already queued
+        reopen = strategy == "astar"
+
         # Initialize an empty explored set
         self.explored = set()
 
@@ -142,7 +345,7 @@ class Maze():
             self.num_explored += 1
 
             # If node is the goal, then we have a solution
-            if node.state == self.goal:
+            if node.state == target:
                 actions = []
                 cells = []
                 while node.parent is not None:
@@ -151,79 +354,389 @@ class Maze():
                     node = node.parent
                 actions.reverse()
                 cells.reverse()
-                self.solution = (actions, cells)
-                return
+                return (actions, cells)
 
             # Mark node as explored
             self.explored.add(node.state)
 
             # Add neighbors to frontier
             for action, state in self.neighbors(node.state):
-                if not frontier.contains_state(state) and state not in self.explored:
-                    child = Node(state=state, parent=node, action=action)
+                if state in self.explored:
+                    continue
+                if reopen or not frontier.contains_state(state):
+                    child = Node(state=state, parent=node, action=action,
+                                 cost=node.cost + 1)
                     frontier.add(child)
 
 
-    def output_image(self, filename, show_solution=True, show_explored=False):
-        from PIL import Image, ImageDraw
-        cell_size = 50
-        cell_border = 2
+    def is_open(self, row, col):
+        """Returns True if (row, col) is inside the maze and not a wall."""
+        return (0 <= row < self.height and 0 <= col < self.width
+                and not self.walls[row][col])
 
-        # Create a blank canvas
-        img = Image.new(
-            "RGBA",
-            (self.width * cell_size, self.height * cell_size),
-            "black"
+
+    def jump(self, state, direction):
+        """Moves from state in direction until a jump point is reached.
+
+        Returns the jump point, or None if the move runs into a wall without
+        passing the goal or a cell where the path may need to turn.
+        """
+        dr, dc = JUMPS[direction]
+        row, col = state
+        while True:
+            row, col = row + dr, col + dc
+            if not self.is_open(row, col):
+                return None
+            if (row, col) == self.goal:
+                return (row, col)
+
+            if dr == 0:
+                # Turning off a row is forced when the cell behind could
+                # not have turned instead
+                for side in (-1, 1):
+                    if (self.is_open(row + side, col)
+                            and not self.is_open(row + side, col - dc)):
+                        return (row, col)
+            else:
+                # Moving along a column, stop where a row scan finds something
+                if (self.jump((row, col), "left") is not None
+                        or self.jump((row, col), "right") is not None):
+                    return (row, col)
+
+
+    def jump_directions(self, state, arrival):
+        """Returns the directions worth jumping in from state.
+
+        Canonical paths take vertical moves as early as possible, so after a
+        vertical move both row directions stay open, while after a
+        horizontal move only straight on and forced turns remain.
+        """
+        if arrival is None:
+            return ["up", "down", "left", "right"]
+        if arrival in ("up", "down"):
+            return [arrival, "left", "right"]
+        row, col = state
+        dc = JUMPS[arrival][1]
+        directions = [arrival]
+        for direction, side in (("up", -1), ("down", 1)):
+            if (self.is_open(row + side, col)
+                    and not self.is_open(row + side, col - dc)):
+                directions.append(direction)
+        return directions
+
+
+    def solve_jps(self, heuristic=manhattan):
+        """Finds a shortest solution with Jump Point Search.
+
+        A* runs over jump points only, skipping the cells in between that
+        lie on symmetric paths. Nodes are keyed on (cell, arrival direction)
+        since the arrival direction decides which jumps are pruned.
+        """
+        if isinstance(heuristic, str):
+            heuristic = HEURISTICS[heuristic]
+
+        # Keep track of number of states explored
+        self.num_explored = 0
+
+        start = Node(state=(self.start, None), parent=None, action=None)
+        frontier = PriorityFrontier(
+            lambda node: (node.cost + heuristic(node.state[0], self.goal),
+                          -node.cost)
         )
-        draw = ImageDraw.Draw(img)
+        frontier.add(start)
+        self.explored = set()
+        closed = set()
 
-        solution = self.solution[1] if self.solution is not None else None
-        for i, row in enumerate(self.walls):
-            for j, col in enumerate(row):
+        while True:
 
-                # Walls
-                if col:
-                    fill = (40, 40, 40)
+            # If nothing left in frontier, then no path
+            if frontier.empty():
+                raise Exception("no solution")
 
-                # Start
-                elif (i, j) == self.start:
-                    fill = (255, 0, 0)
+            node = frontier.remove()
+            self.num_explored += 1
+            cell, arrival = node.state
 
-                # Goal
-                elif (i, j) == self.goal:
-                    fill = (0, 171, 28)
+            # Expand the jumps into single steps
+            if cell == self.goal:
+                jumps = []
+                while node.parent is not None:
+                    jumps.append(node)
+                    node = node.parent
+                actions = []
+                cells = []
+                for node in reversed(jumps):
+                    dr, dc = JUMPS[node.action]
+                    row, col = node.parent.state[0]
+                    while (row, col) != node.state[0]:
+                        row, col = row + dr, col + dc
+                        actions.append(node.action)
+                        cells.append((row, col))
+                self.solution = (actions, cells)
+                return
 
-                # Solution
-                elif solution is not None and show_solution and (i, j) in solution:
-                    fill = (220, 235, 113)
+            closed.add(node.state)
+            self.explored.add(cell)
 
-                # Explored
-                elif solution is not None and show_explored and (i, j) in self.explored:
-                    fill = (212, 97, 85)
+            for direction in self.jump_directions(cell, arrival):
+                point = self.jump(cell, direction)
+                if point is None or (point, direction) in closed:
+                    continue
+                child = Node(state=(point, direction), parent=node,
+                             action=direction, cost=node.cost + manhattan(cell, point))
+                frontier.add(child)
 
-                # Empty cell
-                else:
-                    fill = (237, 240, 252)
 
-                # Draw cell
-                draw.rectangle(
-                    ([(j * cell_size + cell_border, i * cell_size + cell_border),
-                      ((j + 1) * cell_size - cell_border, (i + 1) * cell_size - cell_border)]),
-                    fill=fill
+    def solve_bidirectional(self):
+        """Finds a shortest solution by growing BFS layers from both the
+        start and the goal until the two searches meet."""
+
+        # Keep track of number of states explored
+        self.num_explored = 0
+        self.explored = set()
+
+        start = Node(state=self.start, parent=None, action=None)
+        goal = Node(state=self.goal, parent=None, action=None)
+        forward = QueueFrontier()
+        forward.add(start)
+        backward = QueueFrontier()
+        backward.add(goal)
+
+        # Best node reaching each state; backward nodes point towards the goal
+        forward_reached = {self.start: start}
+        backward_reached = {self.goal: goal}
+
+        meeting = (start, goal) if self.start == self.goal else None
+        while meeting is None:
+
+            # If either side runs out of states, then no path
+            if forward.empty() or backward.empty():
+                raise Exception("no solution")
+
+            # Grow whichever side has the smaller frontier
+            if len(forward.frontier) <= len(backward.frontier):
+                meeting = self.expand_layer(
+                    forward, forward_reached, backward_reached, backward=False
+                )
+            else:
+                meeting = self.expand_layer(
+                    backward, backward_reached, forward_reached, backward=True
                 )
+                if meeting is not None:
+                    meeting = (meeting[1], meeting[0])
+
+        # Follow the forward half back to the start, then the backward half
+        # on to the goal
+        forward_node, backward_node = meeting
+        actions = []
+        cells = []
+        node = forward_node
+        while node.parent is not None:
+            actions.append(node.action)
+            cells.append(node.state)
+            node = node.parent
+        actions.reverse()
+        cells.reverse()
+        node = backward_node
+        while node.parent is not None:
+            actions.append(node.action)
+            cells.append(node.parent.state)
+            node = node.parent
+        self.solution = (actions, cells)
+
+
+    def expand_layer(self, frontier, reached, other_reached, backward):
+        """Expands every node currently in frontier by one step.
+
+        Returns the (node, other side's node) pair with the shortest combined
+        path if the layer touched the other search, otherwise None.
+        """
+        opposite = {"up": "down", "down": "up", "left": "right", "right": "left"}
+        best = None
+        for _ in range(len(frontier.frontier)):
+            node = frontier.remove()
+            self.num_explored += 1
+            self.explored.add(node.state)
+
+            for action, state in self.neighbors(node.state):
+                if state in reached:
+                    continue
+
+                # Backward nodes record the move from their state to the parent
+                child = Node(state=state, parent=node,
+                             action=opposite[action] if backward else action,
+                             cost=node.cost + 1)
+                reached[state] = child
+                frontier.add(child)
+
+                other = other_reached.get(state)
+                if other is not None and (
+                    best is None
+                    or child.cost + other.cost < best[0].cost + best[1].cost
+                ):
+                    best = (child, other)
+        return best
+
+
+    def distance_field(self, source=None, target=None):
+        """Returns BFS distances from source (default start) to every cell.
+
+        Unreachable cells and walls are -1. The whole frontier is advanced
+        at once with array operations. If target is given, the search stops
+        as soon as it is reached.
+        """
+        import numpy as np
+
+        source = self.start if source is None else source
+        walls = np.asarray(self.walls, dtype=bool)
+
+        # Pad with walls so neighbor offsets never leave the grid
+        stride = self.width + 2
+        unvisited = np.zeros((self.height + 2, stride), dtype=bool)
+        unvisited[1:-1, 1:-1] = ~walls
+        unvisited = unvisited.ravel()
+        distances = np.full(unvisited.size, -1, dtype=np.int32)
+        offsets = np.array([-stride, stride, -1, 1])
+
+        def index(state):
+            return (state[0] + 1) * stride + state[1] + 1
+
+        frontier = np.array([index(source)])
+        unvisited[frontier] = False
+        distances[frontier] = 0
+        goal = index(target) if target is not None else None
+
+        level = 0
+        while frontier.size and (goal is None or distances[goal] < 0):
+            level += 1
+            candidates = (frontier[:, None] + offsets).ravel()
+            candidates = candidates[unvisited[candidates]]
+
+            # Drop cells reached from several frontier cells: exactly one
+            # of the scratch values written to each position survives
+            order = np.arange(candidates.size, dtype=np.int32)
+            distances[candidates] = order
+            frontier = candidates[distances[candidates] == order]
+            unvisited[frontier] = False
+            distances[frontier] = level
+
+        return distances.reshape(self.height + 2, stride)[1:-1, 1:-1]
+
+
+    def solve_wavefront(self):
+        """Finds a shortest solution by walking the BFS distance field back
+        from the goal."""
+        self.distances = self.distance_field(target=self.goal)
+        self.explored = CellMask(self.distances >= 0)
+        self.num_explored = len(self.explored)
+
+        row, col = self.goal
+        distance = int(self.distances[row, col])
+        if distance < 0:
+            raise Exception("no solution")
+
+        # Step to any neighbor one closer to the start until we reach it
+        moves = [("up", 1, 0), ("down", -1, 0), ("left", 0, 1), ("right", 0, -1)]
+        actions = []
+        cells = []
+        while distance > 0:
+            for action, dr, dc in moves:
+                r, c = row + dr, col + dc
+                if (0 <= r < self.height and 0 <= c < self.width
+                        and self.distances[r, c] == distance - 1):
+                    actions.append(action)
+                    cells.append((row, col))
+                    row, col, distance = r, c, distance - 1
+                    break
+        actions.reverse()
+        cells.reverse()
+        self.solution = (actions, cells)
+
+
+    def cell_mask(self, cells):
+        """Returns a 2D numpy bool array marking the given cells."""
+        import numpy as np
+
+        if isinstance(cells, CellMask):
+            return cells.mask
+        mask = np.zeros((self.height, self.width), dtype=bool)
+        if cells:
+            rows, cols = zip(*cells)
+            mask[list(rows), list(cols)] = True
+        return mask
+
+
+    def output_image(self, filename, show_solution=True, show_explored=False,
+                     cell_size=50, cell_border=2, tile=None):
+        """Saves a picture of the maze.
+
+        The picture is built as a numpy array with one pixel per cell and
+        then scaled up to cell_size pixels per cell. If tile is given, the
+        maze is cut into blocks of at most tile x tile cells, each saved as
+        <name>_<row>_<col><ext>.
+        """
+        import numpy as np
+        from PIL import Image
+
+        # Palette indices, in increasing order of precedence
+        palette = np.array([
+            (237, 240, 252),  # Empty cell
+            (212, 97, 85),    # Explored
+            (220, 235, 113),  # Solution
+            (0, 171, 28),     # Goal
+            (255, 0, 0),      # Start
+            (40, 40, 40),     # Walls
+            (0, 0, 0),        # Cell border
+        ], dtype=np.uint8)
+
+        cells = np.zeros((self.height, self.width), dtype=np.uint8)
+        if self.solution is not None and show_explored:
+            cells[self.cell_mask(self.explored)] = 1
+        if self.solution is not None and show_solution:
+            cells[self.cell_mask(self.solution[1])] = 2
+        cells[self.goal] = 3
+        cells[self.start] = 4
+        cells[np.asarray(self.walls, dtype=bool)] = 5
+
+        # Pixels of a cell outside [cell_border, cell_size - cell_border]
+        # belong to the border
+        offsets = np.arange(cell_size)
+        inside = (offsets >= cell_border) & (offsets <= cell_size - cell_border)
+
+        if tile is None:
+            tile = max(self.height, self.width)
+        root, ext = os.path.splitext(filename)
+        for top in range(0, self.height, tile):
+            for left in range(0, self.width, tile):
+                block = cells[top:top + tile, left:left + tile]
+                pixels = block.repeat(cell_size, axis=0).repeat(cell_size, axis=1)
+                rows = np.tile(inside, block.shape[0])
+                cols = np.tile(inside, block.shape[1])
+                pixels[~rows, :] = 6
+                pixels[:, ~cols] = 6
+
+                if tile >= max(self.height, self.width):
+                    name = filename
+                else:
+                    name = f"{root}_{top // tile}_{left // tile}{ext}"
+                Image.fromarray(palette[pixels]).save(name)
+
 
-        img.save(filename)
+def main():
+    if len(sys.argv) not in (2, 3):
+        sys.exit("Usage: python maze.py maze.txt [dfs|bfs|greedy|astar|jps|bidirectional|wavefront]")
+    strategy = sys.argv[2] if len(sys.argv) == 3 else "dfs"
 
+    m = Maze(sys.argv[1], compact=strategy == "wavefront")
+    print("Maze:")
+    m.print()
+    print("Solving...")
+    m.solve(strategy)
+    print("States Explored:", m.num_explored)
+    print("Solution:")
+    m.print()
+    m.output_image("maze.png", show_explored=True)
 
-if len(sys.argv) != 2:
-    sys.exit("Usage: python maze.py maze.txt")
 
-m = Maze(sys.argv[1])
-print("Maze:")
-m.print()
-print("Solving...")
-m.solve()
-print("States Explored:", m.num_explored)
-print("Solution:")
-m.print()
-m.output_image("maze.png", show_explored=True)
+if __name__ == "__main__":
+    main()
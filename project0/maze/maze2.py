@@ -1,7 +1,9 @@
-import sys
+import argparse
+import os
+from collections import deque
 import time
 import matplotlib.pyplot as plt
-from matplotlib import colors
+from matplotlib import animation, colors
 import numpy as np
 
 class Node():
@@ -13,13 +15,16 @@ class Node():
 
 class StackFrontier():
     def __init__(self):
-        self.frontier = []
+        self.frontier = deque()
+        # States currently queued, so membership checks don't scan the frontier
+        self.states = set()
 
     def add(self, node):
         self.frontier.append(node)
+        self.states.add(node.state)
 
     def contains_state(self, state):
-        return any(node.state == state for node in self.frontier)
+        return state in self.states
 
     def empty(self):
         return len(self.frontier) == 0
@@ -28,8 +33,8 @@ class StackFrontier():
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[-1]
-            self.frontier = self.frontier[:-1]
+            node = self.frontier.pop()
+            self.states.discard(node.state)
             return node
 
 
@@ -39,10 +44,86 @@ class QueueFrontier(StackFrontier):
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[0]
-            self.frontier = self.frontier[1:]
+            node = self.frontier.popleft()
+            self.states.discard(node.state)
             return node
 
+class Renderer():
+    """Draws the search grid, batching updates so drawing stays cheap.
+
+    A frame is drawn once `every` updates have accumulated or `interval`
+    seconds have passed since the last frame, whichever of the two is given
+    and comes first; with neither, every update is drawn. Frames go to the
+    screen when `show` is set and to an animated GIF/MP4 when `output` is
+    given; with show=False nothing needs a display. When shown, the
+    starting grid stays up for `delay` seconds before the search begins.
+    """
+
+    def __init__(self, grid, every=None, interval=None, output=None, fps=10,
+                 show=True, delay=0):
+        if not show:
+            plt.switch_backend("Agg")
+        self.grid = grid
+        self.every = every
+        self.interval = interval
+        self.fps = fps
+        self.show = show
+
+        self.fig, self.ax = plt.subplots(figsize=(8, 8))
+        cmap = colors.ListedColormap(["black", "white", "red", "green"])
+        bounds = [0, 1, 2, 3, 4]
+        norm = colors.BoundaryNorm(bounds, cmap.N)
+        self.image = self.ax.imshow(grid, cmap=cmap, norm=norm)
+
+        self.writer = None
+        if output is not None:
+            if os.path.splitext(output)[1].lower() == ".gif":
+                self.writer = animation.PillowWriter(fps=fps)
+            else:
+                self.writer = animation.FFMpegWriter(fps=fps)
+            self.writer.setup(self.fig, output, dpi=100)
+
+        self.pending = 0
+        self.frames = 0
+        self.last_frame = time.monotonic()
+        self.draw()
+        if show and delay:
+            plt.pause(delay)
+
+    def update(self):
+        """Records one change to the grid, drawing a frame if one is due."""
+        self.pending += 1
+        if self.every is None and self.interval is None:
+            due = True
+        else:
+            due = (self.every is not None and self.pending >= self.every) or (
+                self.interval is not None
+                and time.monotonic() - self.last_frame >= self.interval
+            )
+        if due:
+            self.draw()
+
+    def draw(self):
+        """Draws the grid as it is now."""
+        self.image.set_data(self.grid)
+        if self.writer is not None:
+            self.writer.grab_frame()
+        if self.show:
+            plt.pause(1 / self.fps)
+        self.pending = 0
+        self.frames += 1
+        self.last_frame = time.monotonic()
+
+    def close(self):
+        """Draws the final grid and finishes the output file."""
+        self.draw()
+        if self.writer is not None:
+            self.writer.finish()
+        if self.show:
+            plt.show()
+        plt.close(self.fig)
+
+
 class Maze():
 
     def __init__(self, filename):
@@ -99,8 +180,11 @@ class Maze():
                 result.append((action, (r, c)))
         return result
 
-    def solve(self):
-        """Finds a solution to maze, if one exists."""
+    def solve(self, render_options=None):
+        """Finds a solution to maze, if one exists, drawing the search.
+
+        render_options are passed on to Renderer.
+        """
 
         # Keep track of number of states explored
         self.num_explored = 0
@@ -114,28 +198,17 @@ class Maze():
         self.explored = set()
 
         # Visualization setup
-        fig, ax = plt.subplots(figsize=(8, 8))
-        cmap = colors.ListedColormap(["black", "white", "red", "green"])
-        bounds = [0, 1, 2, 3, 4]
-        norm = colors.BoundaryNorm(bounds, cmap.N)
-
-        maze_grid = np.array([[0 if self.walls[i][j] else 1 for j in range(self.width)] for i in range(self.height)])
+        maze_grid = np.where(np.array(self.walls, dtype=bool), 0, 1)
         maze_grid[self.start[0]][self.start[1]] = 3
         maze_grid[self.goal[0]][self.goal[1]] = 3
-
-        def update_plot():
-            ax.clear()
-            ax.imshow(maze_grid, cmap=cmap, norm=norm)
-            plt.pause(0.1)
-
-        update_plot()
-        time.sleep(10)
+        renderer = Renderer(maze_grid, **(render_options or {}))
 
         # Keep looping until solution found
         while True:
 
             # If nothing left in frontier, then no path
             if frontier.empty():
+                renderer.close()
                 raise Exception("no solution")
 
             # Choose a node from the frontier
@@ -157,15 +230,14 @@ class Maze():
                 # Highlight the solution path
                 for (r, c) in cells:
                     maze_grid[r][c] = 3
-                update_plot()
                 print(f"Solution found in {self.num_explored} steps!")
-                plt.show()
+                renderer.close()
                 return
 
             # Mark node as explored
             self.explored.add(node.state)
             maze_grid[node.state[0]][node.state[1]] = 2
-            update_plot()
+            renderer.update()
 
             # Add neighbors to frontier
             for action, state in self.neighbors(node.state):
@@ -173,10 +245,35 @@ class Maze():
                     child = Node(state=state, parent=node, action=action)
                     frontier.add(child)
 
-if len(sys.argv) != 2:
-    sys.exit("Usage: python maze.py maze.txt")
-
-m = Maze(sys.argv[1])
-print("Maze:")
-m.solve()
-
+def main():
+    parser = argparse.ArgumentParser(description="Animate a maze search.")
+    parser.add_argument("maze", help="maze text file")
+    parser.add_argument("--every", type=int, default=None,
+                        help="draw a frame every N expanded states "
+                             "(every state if neither this nor --interval is given)")
+    parser.add_argument("--interval", type=float, default=None,
+                        help="draw a frame after this many seconds")
+    parser.add_argument("--output", default=None,
+                        help="write the frames to an animated .gif or .mp4")
+    parser.add_argument("--fps", type=int, default=10,
+                        help="frames per second when showing or writing")
+    parser.add_argument("--delay", type=float, default=0,
+                        help="seconds to show the maze before searching")
+    parser.add_argument("--no-show", dest="show", action="store_false",
+                        help="render without a display")
+    args = parser.parse_args()
+
+    m = Maze(args.maze)
+    print("Maze:")
+    m.solve({
+        "every": args.every,
+        "interval": args.interval,
+        "output": args.output,
+        "fps": args.fps,
+        "show": args.show,
+        "delay": args.delay,
+    })
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+Answers many path queries against the walls of one maze.
+
+The walls are analysed once: every open cell gets a connected-component
+label, so queries between different components fail without searching, and
+optionally a few landmark distance fields are stored to give A* a much
+tighter heuristic (ALT: A*, landmarks, triangle inequality).
+"""
+
+import sys
+from collections import defaultdict
+
+import numpy as np
+
+from maze import Maze, manhattan
+
+
+MOVES = [("up", -1, 0), ("down", 1, 0), ("left", 0, -1), ("right", 0, 1)]
+
+
+def label_components(walls):
+    """Labels the 4-connected regions of open cells; walls are labelled -1.
+
+    Uses vectorized union-find: every round hooks the larger root of each
+    edge that still crosses two trees onto the smaller one, then flattens
+    the trees by pointer jumping.
+    """
+    walls = np.asarray(walls, dtype=bool)
+    open_cells = ~walls
+    index = np.arange(walls.size).reshape(walls.shape)
+
+    # Edges between horizontally and vertically adjacent open cells
+    horizontal = open_cells[:, :-1] & open_cells[:, 1:]
+    vertical = open_cells[:-1, :] & open_cells[1:, :]
+    u = np.concatenate((index[:, :-1][horizontal], index[:-1, :][vertical]))
+    v = np.concatenate((index[:, 1:][horizontal], index[1:, :][vertical]))
+
+    labels = index.ravel().copy()
+    while u.size:
+        lu = labels[u]
+        lv = labels[v]
+        crossing = lu != lv
+        if not crossing.any():
+            break
+        u, v, lu, lv = u[crossing], v[crossing], lu[crossing], lv[crossing]
+
+        np.minimum.at(labels, np.maximum(lu, lv), np.minimum(lu, lv))
+        while True:
+            jumped = labels[labels]
+            if np.array_equal(jumped, labels):
+                break
+            labels = jumped
+
+    labels = labels.reshape(walls.shape)
+    labels[walls] = -1
+    return labels
+
+
+class PathOracle():
+
+    def __init__(self, maze, landmarks=0):
+        """Precomputes component labels and `landmarks` distance fields."""
+        self.maze = maze
+        self.components = label_components(maze.walls)
+        self.landmarks = []
+        self.table = None
+        self.num_explored = 0
+        if landmarks:
+            self.place_landmarks(landmarks)
+
+    def place_landmarks(self, count):
+        """Places landmarks by farthest-point selection in the start's region.
+
+        Each landmark is the cell farthest from all landmarks chosen so far,
+        which spreads them towards the edges of the region.
+        """
+        nearest = self.maze.distance_field(self.maze.start)
+        reachable = nearest >= 0
+        fields = []
+        for _ in range(count):
+            row, col = np.unravel_index(
+                np.argmax(np.where(reachable, nearest, -1)), nearest.shape
+            )
+            landmark = (int(row), int(col))
+            field = self.maze.distance_field(landmark)
+            self.landmarks.append(landmark)
+            fields.append(field)
+            nearest = np.minimum(nearest, field)
+
+        # One row of landmark distances per cell, looked up once per expansion
+        self.table = np.stack(fields, axis=-1)
+        self.region = self.components[self.maze.start]
+
+    def connected(self, a, b):
+        """Returns True if b can be reached from a; False if either cell is
+        off the maze."""
+        height, width = self.components.shape
+        for row, col in (a, b):
+            if not (0 <= row < height and 0 <= col < width):
+                return False
+        label = self.components[a]
+        return label >= 0 and label == self.components[b]
+
+    def heuristic(self, goal):
+        """Returns an admissible distance estimate towards goal.
+
+        Inside the landmark region this is the best triangle-inequality bound
+        |d(L, goal) - d(L, cell)| over all landmarks, elsewhere Manhattan.
+        """
+        if self.table is None or self.components[goal] != self.region:
+            return manhattan
+        table = self.table
+        to_goal = table[goal]
+
+        def alt(state, goal):
+            bound = int(np.abs(table[state] - to_goal).max())
+            return max(bound, manhattan(state, goal))
+        return alt
+
+    def path(self, a, b):
+        """Returns a shortest solution (actions, cells) from a to b.
+
+        Returns None at once if b cannot be reached from a.
+        """
+        self.num_explored = 0
+        if not self.connected(a, b):
+            return None
+        solution = self.maze.search(a, b, "astar", self.heuristic(b))
+        self.num_explored = self.maze.num_explored
+        return solution
+
+    def paths(self, queries):
+        """Answers a batch of (a, b) queries, in order.
+
+        Queries sharing a target reuse one BFS distance field from that
+        target and just walk downhill from each source.
+        """
+        by_target = defaultdict(list)
+        for i, (a, b) in enumerate(queries):
+            by_target[b].append(i)
+
+        results = [None] * len(queries)
+        explored = 0
+        for target, indices in by_target.items():
+            if len(indices) == 1:
+                i = indices[0]
+                results[i] = self.path(*queries[i])
+                explored += self.num_explored
+                continue
+            distances = None
+            for i in indices:
+                source = queries[i][0]
+                if not self.connected(source, target):
+                    continue
+                if distances is None:
+                    distances = self.maze.distance_field(target)
+                    explored += int((distances >= 0).sum())
+                results[i] = self.descend(distances, source)
+        self.num_explored = explored
+        return results
+
+    def descend(self, distances, source):
+        """Follows decreasing distances from source down to the field's origin."""
+        height, width = distances.shape
+        row, col = source
+        distance = int(distances[row, col])
+        actions = []
+        cells = []
+        while distance > 0:
+            for action, dr, dc in MOVES:
+                r, c = row + dr, col + dc
+                if (0 <= r < height and 0 <= c < width
+                        and distances[r, c] == distance - 1):
+                    actions.append(action)
+                    cells.append((r, c))
+                    row, col, distance = r, c, distance - 1
+                    break
+        return (actions, cells)
+
+
+def main():
+    if len(sys.argv) != 2:
+        sys.exit("Usage: python oracle.py maze.txt < queries.txt")
+
+    # Each query line holds four integers: source row, column, target row, column
+    oracle = PathOracle(Maze(sys.argv[1], compact=True), landmarks=8)
+    queries = []
+    for line in sys.stdin:
+        if line.strip():
+            r1, c1, r2, c2 = map(int, line.split())
+            queries.append(((r1, c1), (r2, c2)))
+    for (a, b), solution in zip(queries, oracle.paths(queries)):
+        if solution is None:
+            print(f"{a} -> {b}: no path")
+        else:
+            print(f"{a} -> {b}: {len(solution[0])} steps")
+
+
+if __name__ == "__main__":
+    main()
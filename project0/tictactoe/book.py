@@ -0,0 +1,56 @@
+"""
+Solves every reachable 3x3 position and writes the opening book minimax
+loads with tictactoe.load_book.
+"""
+
+import collections
+import sys
+
+import tictactoe as ttt
+
+
+def solve_all():
+    """
+    Returns the opening book table: the best cell and value of every
+    reachable position where the game is not over yet.
+    """
+    table = bytearray([ttt.BOOK_EMPTY]) * ttt.BOOK_SIZE
+    transpositions = {}
+    killers = collections.defaultdict(list)
+
+    # Walk every position reachable from the empty board once
+    start = ttt.encode(ttt.initial_state())
+    seen = {start}
+    stack = [start]
+    while stack:
+        board = stack.pop()
+        if board.terminal():
+            continue
+
+        cell, value = ttt.search_root(board, killers, table=transpositions)
+        sign = (value > 0) - (value < 0)
+        table[ttt.book_index(board)] = (sign + 1) << 4 | cell
+
+        for action in board.actions():
+            child = board.result(action)
+            if child not in seen:
+                seen.add(child)
+                stack.append(child)
+    return table
+
+
+def main():
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python book.py [book.bin]")
+    filename = sys.argv[1] if len(sys.argv) == 2 else "book.bin"
+
+    table = solve_all()
+    with open(filename, "wb") as f:
+        f.write(ttt.BOOK_MAGIC)
+        f.write(table)
+    positions = sum(1 for entry in table if entry != ttt.BOOK_EMPTY)
+    print(f"Wrote {positions} positions to {filename}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Load test for server.py: plays many concurrent games of random moves
+against the server and reports moves per second and latency percentiles.
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+import tictactoe as ttt
+from server import percentiles
+
+
+async def play(host, port, size, length, deadline, rng, latencies, totals):
+    """
+    Plays games over one connection until deadline, recording the latency
+    of every move the server answers.
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+
+    async def request(line):
+        writer.write((line + "\n").encode())
+        await writer.drain()
+
+    async def reply():
+        line = (await reader.readline()).decode().split()
+        if not line or line[0] == "ERR":
+            raise RuntimeError(f"server replied {' '.join(line) or 'nothing'}")
+        return line
+
+    try:
+        while time.monotonic() < deadline:
+            user = rng.choice([ttt.X, ttt.O])
+            board = ttt.initial_state(size)
+            started = time.monotonic()
+            await request(f"NEW {user} {size} {length}")
+            await reply()
+            if user == ttt.O:
+                line = await reply()
+                latencies.append(time.monotonic() - started)
+                board = ttt.result(board, (int(line[1]), int(line[2])))
+
+            while True:
+                move = rng.choice(sorted(ttt.actions(board)))
+                board = ttt.result(board, move)
+                started = time.monotonic()
+                await request(f"MOVE {move[0]} {move[1]}")
+                if ttt.terminal(board, length):
+                    await reply()
+                    break
+                line = await reply()
+                latencies.append(time.monotonic() - started)
+                board = ttt.result(board, (int(line[1]), int(line[2])))
+                if ttt.terminal(board, length):
+                    await reply()
+                    break
+            totals["games"] += 1
+        await request("QUIT")
+    finally:
+        writer.close()
+
+
+async def run(args):
+    deadline = time.monotonic() + args.duration
+    latencies = []
+    totals = {"games": 0}
+    started = time.monotonic()
+    await asyncio.gather(*[
+        play(args.host, args.port, args.size, args.length, deadline,
+             random.Random(args.seed + i), latencies, totals)
+        for i in range(args.sessions)
+    ])
+    elapsed = time.monotonic() - started
+
+    latency = percentiles(latencies, (50, 90, 99, 100))
+    print(f"{args.sessions} sessions, {totals['games']} games, {len(latencies)} AI moves in {elapsed:.1f}s")
+    print(f"moves/s {len(latencies) / elapsed:.1f}")
+    print("latency " + " ".join(f"p{q} {value * 1000:.2f}ms" for q, value in latency.items()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the tictactoe server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--sessions", type=int, default=1000,
+                        help="concurrent connections")
+    parser.add_argument("--duration", type=float, default=10,
+                        help="seconds to keep starting games")
+    parser.add_argument("--size", type=int, default=3)
+    parser.add_argument("--length", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
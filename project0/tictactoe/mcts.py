@@ -0,0 +1,242 @@
+"""
+Monte Carlo tree search (UCT) player for boards too big for minimax to
+solve, plus a harness that plays it against minimax.
+
+The tree grows one node per iteration, chosen by the UCB1 rule, and each
+new node is scored by a batch of random playouts. The tree is kept between
+moves, so the search continues from whatever it already knows about the
+position that was reached.
+"""
+
+import argparse
+import math
+import random
+import time
+
+import tictactoe as ttt
+
+
+class Node():
+    """
+    Position in the search tree. wins counts the playouts won by the player
+    who moved into the position, with draws counting half.
+    """
+    __slots__ = ("board", "parent", "cell", "children", "untried", "visits", "wins")
+
+    def __init__(self, board, parent=None, cell=None):
+        self.board = board
+        self.parent = parent
+        self.cell = cell
+        self.children = []
+        self.untried = [] if board.terminal() else board.game.candidates(board)
+        self.visits = 0
+        self.wins = 0.0
+
+
+class MCTS():
+
+    def __init__(self, playouts=2000, time_limit=None, batch=8,
+                 exploration=math.sqrt(2), seed=None):
+        """
+        Searches until `playouts` random games were played or time_limit
+        seconds have passed, whichever comes first; either may be None.
+        Every new node is scored by `batch` playouts.
+        """
+        if playouts is None and time_limit is None:
+            raise ValueError("need a playout budget or a time limit")
+        if playouts is not None and playouts < 1:
+            raise ValueError("playouts must be at least 1")
+        if batch < 1:
+            raise ValueError("batch must be at least 1")
+        self.playouts = playouts
+        self.time_limit = time_limit
+        self.batch = batch
+        self.exploration = exploration
+        self.rng = random.Random(seed)
+        self.root = None
+
+    def move(self, board, length=None, stats=None):
+        """
+        Returns the action (i, j) to play on a list-of-lists board, or None
+        if the game is over.
+
+        If a stats dict is given, stats["playouts"] is set to the number of
+        playouts and stats["nodes"] to the number of positions visited.
+        """
+        compact = ttt.encode(board, length)
+        if stats is not None:
+            stats["playouts"] = stats["nodes"] = 0
+        if compact.terminal():
+            return None
+        cell = self.search(compact, stats)
+        return divmod(cell, compact.game.size)
+
+    def reuse(self, board):
+        """
+        Makes the node for board the root, keeping its subtree if the board
+        was reached from the previous root in at most two moves.
+        """
+        if self.root is not None:
+            if self.root.board == board:
+                return
+            for child in self.root.children:
+                for node in [child] + child.children:
+                    if node.board == board:
+                        node.parent = None
+                        self.root = node
+                        return
+        self.root = Node(board)
+
+    def search(self, board, stats=None):
+        """
+        Returns the most visited cell from board after searching.
+        """
+        self.reuse(board)
+        deadline = None
+        if self.time_limit is not None:
+            deadline = time.monotonic() + self.time_limit
+        playouts = 0
+        nodes = 0
+
+        # The budget is checked after the first iteration, so the root always
+        # has a child to return
+        while True:
+            if playouts and self.playouts is not None and playouts >= self.playouts:
+                break
+            if playouts and deadline is not None and time.monotonic() >= deadline:
+                break
+
+            # Selection: descend through fully expanded nodes by UCB1
+            node = self.root
+            while not node.untried and node.children:
+                node = self.select(node)
+                nodes += 1
+
+            # Expansion: add one untried move
+            if node.untried:
+                cell = node.untried.pop(self.rng.randrange(len(node.untried)))
+                child = Node(node.board.result(cell), node, cell)
+                node.children.append(child)
+                node = child
+                nodes += 1
+
+            # Simulation: score the node by a batch of random playouts, from
+            # the point of view of the player who moved into it
+            mover = ttt.O if node.board.player() == ttt.X else ttt.X
+            wins = 0.0
+            for _ in range(self.batch):
+                winner, moves = self.playout(node.board)
+                nodes += moves
+                if winner == mover:
+                    wins += 1
+                elif winner is None:
+                    wins += 0.5
+            playouts += self.batch
+
+            # Backpropagation: a win for one player is a loss for the other
+            while node is not None:
+                node.visits += self.batch
+                node.wins += wins
+                wins = self.batch - wins
+                node = node.parent
+
+        if stats is not None:
+            stats["playouts"] += playouts
+            stats["nodes"] += nodes
+        best = max(self.root.children, key=lambda child: child.visits)
+        return best.cell
+
+    def select(self, node):
+        """
+        Returns the child of node with the highest upper confidence bound.
+        """
+        scale = self.exploration * math.sqrt(math.log(node.visits))
+        return max(node.children, key=lambda child:
+                   child.wins / child.visits + scale / math.sqrt(child.visits))
+
+    def playout(self, board):
+        """
+        Plays random moves from board until the game ends. Returns the
+        winner, or None for a draw, and the number of moves played.
+        """
+        game = board.game
+        if board.terminal():
+            return board.winner(), 0
+        free = board.actions()
+        self.rng.shuffle(free)
+
+        # Only the player who just moved can have completed a line
+        masks = {ttt.X: board.x, ttt.O: board.o}
+        turn = board.player()
+        for moves, cell in enumerate(free, 1):
+            masks[turn] |= 1 << cell
+            if game.wins(masks[turn]):
+                return turn, moves
+            turn = ttt.O if turn == ttt.X else ttt.X
+        return None, len(free)
+
+
+def play(players, size, length):
+    """
+    Plays one game between players[X] and players[O], each a function from
+    a board to an action. Returns the winner, or None for a draw.
+    """
+    board = ttt.initial_state(size)
+    while not ttt.terminal(board, length):
+        board = ttt.result(board, players[ttt.player(board)](board))
+    return ttt.winner(board, length)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play MCTS against minimax.")
+    parser.add_argument("--size", type=int, default=3)
+    parser.add_argument("--length", type=int, default=None)
+    parser.add_argument("--games", type=int, default=10,
+                        help="games per time limit, alternating colors")
+    parser.add_argument("--time-limits", nargs="+", type=float, default=[0.05, 0.2, 1],
+                        help="seconds per move for both players")
+    parser.add_argument("--batch", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    exact = args.size == 3
+    for time_limit in args.time_limits:
+        mcts = MCTS(playouts=None, time_limit=time_limit, batch=args.batch, seed=args.seed)
+        mcts_stats = {}
+        minimax_stats = {}
+        results = {"win": 0, "draw": 0, "loss": 0}
+        for n in range(args.games):
+            mcts.root = None
+
+            def mcts_player(board):
+                stats = {}
+                move = mcts.move(board, args.length, stats)
+                for key, value in stats.items():
+                    mcts_stats[key] = mcts_stats.get(key, 0) + value
+                return move
+
+            def minimax_player(board):
+                stats = {}
+                move = ttt.minimax(board, stats=stats, length=args.length,
+                                   time_limit=None if exact else time_limit)
+                minimax_stats["nodes"] = minimax_stats.get("nodes", 0) + stats["nodes"]
+                return move
+
+            mcts_side = ttt.X if n % 2 == 0 else ttt.O
+            other = ttt.O if mcts_side == ttt.X else ttt.X
+            winner = play({mcts_side: mcts_player, other: minimax_player},
+                          args.size, args.length)
+            if winner is None:
+                results["draw"] += 1
+            elif winner == mcts_side:
+                results["win"] += 1
+            else:
+                results["loss"] += 1
+
+        print(f"{time_limit:6.2f}s/move  MCTS won {results['win']}, drew {results['draw']}, "
+              f"lost {results['loss']}  ({mcts_stats.get('playouts', 0)} playouts, "
+              f"minimax {minimax_stats.get('nodes', 0)} positions)")
+
+
+if __name__ == "__main__":
+    main()
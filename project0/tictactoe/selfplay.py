@@ -0,0 +1,137 @@
+"""
+Headless self-play harness: plays many games with each search backend and
+reports games and positions per second, AI move latency percentiles and
+how the games ended.
+
+Each backend plays either itself or a uniformly random opponent, swapping
+colors every game.
+"""
+
+import argparse
+import os
+import random
+import time
+
+import tictactoe as ttt
+from mcts import MCTS
+from server import percentiles
+
+
+BACKENDS = ["alphabeta", "parallel", "mcts", "fullsearch", "random"]
+
+
+def make_player(backend, args, rng):
+    """
+    Returns a function from a board and a stats dict to the backend's move.
+    """
+    # Exact search only finishes on 3x3; bigger boards search to a deadline
+    time_limit = None if args.size == 3 else args.time_limit
+
+    if backend == "alphabeta":
+        return lambda board, stats: ttt.minimax(
+            board, stats=stats, length=args.length, time_limit=time_limit)
+    if backend == "parallel":
+        return lambda board, stats: ttt.minimax(
+            board, stats=stats, length=args.length, time_limit=time_limit,
+            workers=args.workers)
+    if backend == "fullsearch":
+        if args.size != 3:
+            raise ValueError("fullsearch only runs on 3x3 boards")
+        return lambda board, stats: ttt.minimax(board, alpha_beta_pruning=False, stats=stats)
+    if backend == "mcts":
+        mcts = MCTS(playouts=args.playouts, time_limit=args.time_limit if args.size != 3 else None,
+                    seed=rng.randrange(1 << 30))
+        return lambda board, stats: mcts.move(board, args.length, stats)
+    if backend == "random":
+        def random_player(board, stats):
+            stats["nodes"] = 0
+            return rng.choice(sorted(ttt.actions(board)))
+        return random_player
+    raise ValueError(f"unknown backend {backend}")
+
+
+def run(backend, opponent, args, rng):
+    """
+    Plays args.games games of backend against opponent, which is either
+    "self" or "random". Returns the totals and latency samples.
+    """
+    totals = {"games": 0, "nodes": 0, "X": 0, "O": 0, "draw": 0,
+              "backend wins": 0, "opponent wins": 0}
+    latencies = []
+    started = time.perf_counter()
+
+    for n in range(args.games):
+        if args.cold:
+            ttt.game_for(args.size, args.length).transpositions.clear()
+        ai = make_player(backend, args, rng)
+        other = ai if opponent == "self" else make_player("random", args, rng)
+        ai_side = ttt.X if n % 2 == 0 else ttt.O
+        players = {ai_side: ai, ttt.O if ai_side == ttt.X else ttt.X: other}
+
+        board = ttt.initial_state(args.size)
+        while not ttt.terminal(board, args.length):
+            current = ttt.player(board)
+            stats = {}
+            move_started = time.perf_counter()
+            move = players[current](board, stats)
+            if players[current] is ai:
+                latencies.append(time.perf_counter() - move_started)
+                totals["nodes"] += stats.get("nodes", 0)
+            board = ttt.result(board, move)
+
+        winner = ttt.winner(board, args.length)
+        totals["games"] += 1
+        totals[winner or "draw"] += 1
+        if winner is not None and opponent == "random":
+            totals["backend wins" if winner == ai_side else "opponent wins"] += 1
+
+    totals["seconds"] = time.perf_counter() - started
+    return totals, latencies
+
+
+def report(backend, opponent, totals, latencies):
+    seconds = totals["seconds"]
+    latency = percentiles(latencies, (50, 90, 99))
+    line = (f"{backend:>10} vs {opponent:<6} {totals['games']:>6} games "
+            f"{totals['games'] / seconds:9.1f} games/s "
+            f"{totals['nodes'] / seconds:11.0f} nodes/s  "
+            + " ".join(f"p{q} {value * 1000:8.3f}ms" for q, value in latency.items())
+            + f"  X {totals['X']} O {totals['O']} draw {totals['draw']}")
+    if opponent == "random":
+        line += f" (won {totals['backend wins']}, lost {totals['opponent wins']})"
+    print(line, flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure tictactoe AI throughput by self-play.")
+    parser.add_argument("--backends", nargs="+", default=["alphabeta", "mcts", "random"],
+                        choices=BACKENDS)
+    parser.add_argument("--opponent", choices=["self", "random", "both"], default="both")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--size", type=int, default=3)
+    parser.add_argument("--length", type=int, default=None)
+    parser.add_argument("--time-limit", type=float, default=0.1,
+                        help="seconds per move on boards bigger than 3x3")
+    parser.add_argument("--playouts", type=int, default=500,
+                        help="MCTS playouts per move")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="processes for the parallel backend")
+    parser.add_argument("--book", default=None,
+                        help="opening book to load, e.g. book.bin")
+    parser.add_argument("--cold", action="store_true",
+                        help="clear the transposition table before every game")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.book:
+        ttt.load_book(args.book)
+    opponents = ["self", "random"] if args.opponent == "both" else [args.opponent]
+    rng = random.Random(args.seed)
+    for backend in args.backends:
+        for opponent in opponents:
+            totals, latencies = run(backend, opponent, args, rng)
+            report(backend, opponent, totals, latencies)
+
+
+if __name__ == "__main__":
+    main()
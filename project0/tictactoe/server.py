@@ -0,0 +1,276 @@
+"""
+Tic Tac Toe server: hosts many games against the minimax AI over TCP.
+
+Each connection plays one game at a time using a line protocol:
+
+    NEW X|O [size [length]]   start a game, playing as X or O
+    MOVE row col              make a move; the AI answers with AI row col
+    BOARD                     show the board, rows separated by /
+    STATS                     show server throughput and latency
+    QUIT                      close the connection
+
+Replies start with OK, AI, OVER (followed by X, O or TIE) or ERR. Searches
+run in a thread pool, off the event loop, and all games share one bounded
+LRU position cache. Games are built off the event loop too, since a 4x4
+game's lookup tables take a second or two.
+"""
+
+import argparse
+import asyncio
+import collections
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import tictactoe as ttt
+
+
+class LRUCache():
+    """
+    Bounded mapping that evicts the least recently used entry when full.
+    Safe to share between threads.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.entries = collections.OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self.lock:
+            try:
+                value = self.entries[key]
+            except KeyError:
+                return default
+            self.entries.move_to_end(key)
+            return value
+
+    def __setitem__(self, key, value):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            if len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class GameCache():
+    """
+    Transposition table for one game, stored in a cache shared by all games.
+    """
+
+    def __init__(self, cache, game):
+        self.cache = cache
+        self.game = (game.size, game.length)
+
+    def get(self, key, default=None):
+        return self.cache.get((self.game, key), default)
+
+    def __setitem__(self, key, value):
+        self.cache[(self.game, key)] = value
+
+
+def percentiles(samples, quantiles=(50, 90, 99)):
+    """
+    Returns {q: value} for each quantile q (in percent) of samples.
+    """
+    ordered = sorted(samples)
+    if not ordered:
+        return {q: 0.0 for q in quantiles}
+    return {q: ordered[min(len(ordered) - 1, len(ordered) * q // 100)] for q in quantiles}
+
+
+class Server():
+
+    # Seconds of recent AI moves the reported move rate covers
+    rate_window = 10.0
+
+    def __init__(self, workers, cache_size, time_limit, max_size):
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.cache = LRUCache(cache_size)
+        self.time_limit = time_limit
+        self.max_size = max_size
+        self.started = time.monotonic()
+        self.sessions = 0
+        self.moves = 0
+        # Latency of recent AI moves, queueing included
+        self.latencies = collections.deque(maxlen=10000)
+        # Completion times of the AI moves in the last rate_window seconds
+        self.recent = collections.deque()
+
+    def prepare(self, size, length):
+        """
+        Builds the games a session uses and the win table the event loop
+        checks after every move; runs in a worker thread.
+        """
+        ttt.game_for(size)
+        ttt.game_for(size, length).win_table()
+
+    def search(self, board, length):
+        """
+        Returns the AI's move; runs in a worker thread.
+        """
+        game = ttt.game_for(len(board), length)
+        exact = game.size == 3
+        return ttt.minimax(board, table=GameCache(self.cache, game), length=length,
+                           time_limit=None if exact else self.time_limit)
+
+    async def ai_move(self, board, length):
+        started = time.monotonic()
+        loop = asyncio.get_running_loop()
+        move = await loop.run_in_executor(self.executor, self.search, board, length)
+        finished = time.monotonic()
+        self.latencies.append(finished - started)
+        self.recent.append(finished)
+        self.moves += 1
+        return move
+
+    def move_rate(self):
+        """
+        Returns the AI moves per second over the last rate_window seconds.
+        """
+        now = time.monotonic()
+        while self.recent and self.recent[0] < now - self.rate_window:
+            self.recent.popleft()
+        return len(self.recent) / max(min(self.rate_window, now - self.started), 1e-9)
+
+    def stats(self):
+        latency = percentiles(self.latencies)
+        return (f"sessions {self.sessions} moves {self.moves} "
+                f"moves/s {self.move_rate():.1f} cache {len(self.cache)} "
+                f"p50 {latency[50] * 1000:.2f}ms p90 {latency[90] * 1000:.2f}ms "
+                f"p99 {latency[99] * 1000:.2f}ms")
+
+    async def handle(self, reader, writer):
+        self.sessions += 1
+        board = None
+        length = None
+
+        def send(line):
+            writer.write((line + "\n").encode())
+
+        async def reply_if_over():
+            if not ttt.terminal(board, length):
+                return False
+            winner = ttt.winner(board, length)
+            send(f"OVER {winner or 'TIE'}")
+            return True
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                command = line.decode().split()
+                if not command:
+                    continue
+                name = command[0].upper()
+
+                if name == "QUIT":
+                    break
+
+                elif name == "STATS":
+                    send(f"OK {self.stats()}")
+
+                elif name == "NEW":
+                    try:
+                        user = command[1].upper()
+                        size = int(command[2]) if len(command) > 2 else 3
+                        length = int(command[3]) if len(command) > 3 else None
+                        if user not in (ttt.X, ttt.O) or not 1 <= size <= self.max_size:
+                            raise ValueError
+                        if length is not None and not 1 <= length <= size:
+                            raise ValueError
+                    except (IndexError, ValueError):
+                        send(f"ERR usage: NEW X|O [size [length]], size at most {self.max_size}")
+                        continue
+                    loop = asyncio.get_running_loop()
+                    await loop.run_in_executor(self.executor, self.prepare, size, length)
+                    board = ttt.initial_state(size)
+                    send("OK")
+                    if user == ttt.O:
+                        move = await self.ai_move(board, length)
+                        board = ttt.result(board, move)
+                        send(f"AI {move[0]} {move[1]}")
+
+                elif name == "MOVE":
+                    if board is None or ttt.terminal(board, length):
+                        send("ERR no game in progress")
+                        continue
+                    try:
+                        move = (int(command[1]), int(command[2]))
+                        if not (0 <= move[0] < len(board) and 0 <= move[1] < len(board)):
+                            raise ValueError
+                        board = ttt.result(board, move)
+                    except (IndexError, ValueError):
+                        send("ERR illegal move")
+                        continue
+                    if await reply_if_over():
+                        continue
+                    move = await self.ai_move(board, length)
+                    board = ttt.result(board, move)
+                    send(f"AI {move[0]} {move[1]}")
+                    await reply_if_over()
+
+                elif name == "BOARD":
+                    if board is None:
+                        send("ERR no game in progress")
+                    else:
+                        send("OK " + "/".join("".join(cell or "." for cell in row) for row in board))
+
+                else:
+                    send("ERR unknown command")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.sessions -= 1
+            writer.close()
+
+    async def report(self, interval):
+        while True:
+            await asyncio.sleep(interval)
+            print(self.stats(), flush=True)
+
+
+async def serve(args):
+    server = Server(args.workers, args.cache_size, args.time_limit, args.max_size)
+    listener = await asyncio.start_server(server.handle, args.host, args.port)
+    print(f"Serving on {args.host}:{args.port}", flush=True)
+    if args.report:
+        asyncio.ensure_future(server.report(args.report))
+    async with listener:
+        await listener.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve tictactoe games against minimax.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="threads running searches")
+    parser.add_argument("--cache-size", type=int, default=1000000,
+                        help="positions kept in the shared cache")
+    parser.add_argument("--time-limit", type=float, default=0.5,
+                        help="seconds per AI move on boards bigger than 3x3")
+    parser.add_argument("--max-size", type=int, default=19,
+                        help="largest board size a client may ask for")
+    parser.add_argument("--report", type=float, default=10,
+                        help="seconds between stats lines, 0 to disable")
+    parser.add_argument("--book", default="book.bin",
+                        help="opening book to load if it exists")
+    args = parser.parse_args()
+
+    if os.path.exists(args.book):
+        ttt.load_book(args.book)
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -4,41 +4,279 @@ Tic Tac Toe Player
 
 import math
 import collections
-import  copy
+import functools
 import math
+import multiprocessing
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
 
 X = "X"
 O = "O"
 EMPTY = None
 
 
-def initial_state():
+def initial_state(size=3):
     """
     Returns starting state of the board.
     """
-    return [[EMPTY, EMPTY, EMPTY],
-            [EMPTY, EMPTY, EMPTY],
-            [EMPTY, EMPTY, EMPTY]]
+    return [[EMPTY] * size for _ in range(size)]
+
+
+# Score of a won position for X; wins reached in fewer moves score higher
+WIN = 10 ** 9
+
+
+class Game():
+    """
+    Geometry of a size x size board where `length` marks in a row win.
+
+    Compact boards keep one bit mask of cells per player, with bit i standing
+    for cell (i // size, i % size). The game holds the masks of every winning
+    window, the order in which to try cells, and for boards of up to 16
+    cells lookup tables indexed by a whole mask, built on first use.
+    """
+
+    def __init__(self, size=3, length=None):
+        self.size = size
+        self.length = size if length is None else length
+        if not 1 <= self.length <= size:
+            raise ValueError("win length must be between 1 and the board size")
+        self.cells = size * size
+        self.full = (1 << self.cells) - 1
+        self.transpositions = {}
+
+        def mask(cells):
+            return sum(1 << (i * size + j) for i, j in cells)
+
+        # Winning windows, and for each direction the bit shift between
+        # neighbouring cells and the mask of cells a window can start from
+        k = self.length
+        self.runs = []
+        self.windows = []
+        for di, dj in ((0, 1), (1, 0), (1, 1), (1, -1)):
+            starts = [(i, j) for i in range(size) for j in range(size)
+                      if 0 <= i + di * (k - 1) < size and 0 <= j + dj * (k - 1) < size]
+            self.runs.append((di * size + dj, mask(starts)))
+            for i, j in starts:
+                self.windows.append(mask((i + di * n, j + dj * n) for n in range(k)))
+
+        # Cells on more winning windows are tried first: on 3x3 that is
+        # center, then corners, then edges
+        self.rank = [-sum(1 for window in self.windows if window >> cell & 1)
+                     for cell in range(self.cells)]
+        self.near = [mask((i + di, j + dj)
+                          for di in (-1, 0, 1) for dj in (-1, 0, 1)
+                          if 0 <= i + di < size and 0 <= j + dj < size)
+                     for i in range(size) for j in range(size)]
+
+        # Open-line weights for the heuristic, by number of marks in a window
+        self.weights = [0] + [10 ** n for n in range(1, k)]
+
+        # Whole-mask lookup tables, built on first use: on 4x4 they take
+        # a second or two, and boards that only place marks never need them
+        self.winning = None
+        self.symmetry_maps = None
+
+    def has_run(self, mask):
+        """
+        Returns True if mask contains `length` cells in a row.
+        """
+        for shift, starts in self.runs:
+            run = mask & starts
+            for n in range(1, self.length):
+                run &= mask >> (shift * n)
+            if run:
+                return True
+        return False
+
+    def win_table(self):
+        """
+        Returns wins(mask) for every mask, or None on boards of more than
+        16 cells.
+        """
+        if self.winning is None and self.cells <= 16:
+            self.winning = [self.has_run(mask) for mask in range(1 << self.cells)]
+        return self.winning
+
+    def symmetry_table(self):
+        """
+        Returns, for each rotation and reflection, the image of every mask,
+        or None on boards of more than 16 cells.
+        """
+        if self.symmetry_maps is None and self.cells <= 16:
+            size = self.size
+            self.symmetry_maps = [
+                [sum(1 << n for n, (i, j) in enumerate(cells) if mask >> (i * size + j) & 1)
+                 for mask in range(1 << self.cells)]
+                for cells in symmetries(size)
+            ]
+        return self.symmetry_maps
+
+    def wins(self, mask):
+        if self.winning is not None:
+            return self.winning[mask]
+        if self.win_table() is not None:
+            return self.winning[mask]
+        return self.has_run(mask)
+
+    def candidates(self, board):
+        """
+        Returns the free cells worth trying. On boards bigger than 4x4 only
+        cells next to a mark are considered, or the center on an empty board.
+        """
+        taken = board.x | board.o
+        free = self.full & ~taken
+        if self.cells > 16:
+            if not taken:
+                return [self.cells // 2]
+            around = 0
+            for cell in range(self.cells):
+                if taken >> cell & 1:
+                    around |= self.near[cell]
+            free &= around
+        return [cell for cell in range(self.cells) if free >> cell & 1]
+
+    def evaluate(self, board):
+        """
+        Returns a heuristic value for X: every window still open to only one
+        player counts for that player, more so the more marks it holds.
+        """
+        score = 0
+        for window in self.windows:
+            xs = window & board.x
+            os = window & board.o
+            if xs and not os:
+                score += self.weights[bin(xs).count("1")]
+            elif os and not xs:
+                score -= self.weights[bin(os).count("1")]
+        return max(-WIN // 4, min(WIN // 4, score))
+
+
+# Games created so far, by (size, length)
+games = {}
+
+
+def game_for(size=3, length=None):
+    """
+    Returns the shared Game for a board size and win length.
+    """
+    length = size if length is None else length
+    if (size, length) not in games:
+        games[size, length] = Game(size, length)
+    return games[size, length]
+
+
+@functools.lru_cache(maxsize=None)
+def symmetries(size):
+    """
+    Returns, for each of the 8 rotations and reflections of a size x size
+    board, the cells of the transformed board in row-major order.
+    """
+    last = size - 1
+    transforms = [
+        lambda i, j: (i, j),
+        lambda i, j: (j, last - i),
+        lambda i, j: (last - i, last - j),
+        lambda i, j: (last - j, i),
+        lambda i, j: (i, last - j),
+        lambda i, j: (last - i, j),
+        lambda i, j: (j, i),
+        lambda i, j: (last - j, last - i),
+    ]
+    return [[transform(i, j) for i in range(size) for j in range(size)]
+            for transform in transforms]
+
+
+class Board(collections.namedtuple("Board", ["x", "o", "game"])):
+    """
+    Immutable compact board: x and o are the masks of the cells taken by
+    each player in game.
+    """
+    __slots__ = ()
+
+    def player(self):
+        return X if bin(self.x).count("1") == bin(self.o).count("1") else O
+
+    def actions(self):
+        free = self.game.full & ~(self.x | self.o)
+        return [cell for cell in range(self.game.cells) if free >> cell & 1]
+
+    def result(self, cell):
+        bit = 1 << cell
+        if (self.x | self.o) & bit:
+            raise ValueError("action cell already taken!")
+        if self.player() == X:
+            return Board(self.x | bit, self.o, self.game)
+        return Board(self.x, self.o | bit, self.game)
+
+    def winner(self):
+        if self.game.wins(self.x):
+            return X
+        if self.game.wins(self.o):
+            return O
+        return None
+
+    def full(self):
+        return (self.x | self.o) == self.game.full
+
+    def terminal(self):
+        return self.winner() is not None or self.full()
+
+    def utility(self):
+        winner = self.winner()
+        if winner == X:
+            return 1
+        if winner == O:
+            return -1
+        return 0
+
+    def canonical(self):
+        """
+        Returns an integer key for the board. Up to 4x4 it is shared with
+        all the board's rotations and reflections.
+        """
+        maps = self.game.symmetry_table()
+        if maps is None:
+            return self.x | self.o << self.game.cells
+        return min(image[self.x] | image[self.o] << self.game.cells for image in maps)
+
+
+def encode(board, length=None):
+    """
+    Returns the compact Board for a list-of-lists board.
+    """
+    size = len(board)
+    x = o = 0
+    for i, row in enumerate(board):
+        for j, cell in enumerate(row):
+            if cell == X:
+                x |= 1 << (i * size + j)
+            elif cell == O:
+                o |= 1 << (i * size + j)
+    return Board(x, o, game_for(size, length))
+
+
+def decode(compact):
+    """
+    Returns the list-of-lists board for a compact Board.
+    """
+    size = compact.game.size
+    return [[X if compact.x >> (i * size + j) & 1 else O if compact.o >> (i * size + j) & 1 else EMPTY
+             for j in range(size)]
+            for i in range(size)]
 
 
 def player(board):
     """
     Returns player who has the next turn on a board.
     """
-    flattened_board = [item for sublist in board for item in sublist]
-    counter = collections.Counter(flattened_board)
-    x_counts = counter[X]
-    o_counts = counter[O]
-    if x_counts == o_counts:
-        return X
-    else:
-        return O
+    return encode(board).player()
 
 
 test_board = [[X,EMPTY, X], [X,O, X], [EMPTY,O,EMPTY]]
 
-print(player([[X,O], [EMPTY,EMPTY], [EMPTY,EMPTY]]))
-
 
 def actions(board):
     """
@@ -51,68 +289,25 @@ def actions(board):
                 possible_actions.add((row, column))
     return possible_actions
 
-print(actions([[X,O], [X,X], [O,O]]))
 
 def result(board, action):
     """
     Returns the board that results from making move (i, j) on the board.
     """
-    if board[action[0]][action[1]] != EMPTY:
-        raise ValueError("action cell already taken!")
-    copied_board = copy.deepcopy(board)
-    copied_board[action[0]][action[1]] = player(copied_board)
-
-    return copied_board
+    return decode(encode(board).result(action[0] * len(board) + action[1]))
 
 
 #print(result(test_board,(0,0) ))
 
 
-def winner(board):
+def winner(board, length=None):
     """
-    Returns the winner of the game, if there is one.
+    Returns the winner of the game, if there is one. length is the number of
+    marks in a row needed to win, by default the board size.
     """
 
     assert(len(board) == len(board[0]))
-    board_size = len(board)
-
-    for row in range(board_size):
-        if all([(cell == X) for cell in board[row]]):
-            return board[row][0]
-
-        if all([(cell == O) for cell in board[row]]):
-            return board[row][0]
-
-    # for column in range(len(board[0])):
-    #     value = board[0][column]
-    #     all_rows = True
-    #     for row in range(len(board)):
-    #         if value != board[row][column]:
-    #             all_rows=False
-    #     if all_rows:
-    #         return board[0][column]
-
-    for column in range(board_size):
-        if board[0][column] != EMPTY:
-            if all([board[row][column] == board[0][column] for row in range(board_size)]):
-                return board[0][column]
-
-    value = board[0][0]
-    for index in range(board_size):
-        if value != board[index][index]:
-            value = EMPTY
-            break
-    if value != EMPTY:
-        return value
-
-    value = board[board_size-1][0]
-    for index in range(board_size):
-        if value != board[board_size - 1 - index][index]:
-            value = EMPTY
-            break
-    if value != EMPTY:
-        return value
-    return None
+    return encode(board, length).winner()
 
 
 winner_row_x = [[X,EMPTY, X], [X,X, X], [EMPTY,O,EMPTY]]
@@ -127,15 +322,16 @@ assert(winner(winner_col_o) == O)
 assert(winner(no_winner) == None)
 assert(winner(winner_diag_up) == O)
 assert (winner(winner_diag_down) == X)
+assert(decode(encode(winner_diag_up)) == winner_diag_up)
 
 #print(winner(test_board))
 
 
-def terminal(board):
+def terminal(board, length=None):
     """
     Returns True if game is over, False otherwise.
     """
-    if winner(board):
+    if winner(board, length):
         return True
 
     for row in board:
@@ -148,11 +344,11 @@ assert(terminal(winner_col_o) == True)
 assert(terminal(no_winner) == False)
 
 
-def utility(board):
+def utility(board, length=None):
     """
     Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
     """
-    val = winner(board)
+    val = winner(board, length)
     if val == X:
         return 1
     if val == O:
@@ -185,48 +381,427 @@ def evaluate(board):
 
 
 
-def min_value(board):
+def min_value(board, stats=None):
+    if stats is not None:
+        stats["nodes"] += 1
     if terminal(board):
         return utility(board)
     val = 1000
     for action in actions(board):
         modified_board = result(board, action)
-        val = min(max_value(modified_board), val)
+        val = min(max_value(modified_board, stats), val)
     return val
 
 
-def max_value(board):
+def max_value(board, stats=None):
+    if stats is not None:
+        stats["nodes"] += 1
     if terminal(board):
         return utility(board)
     val = -1000
     for action in actions(board):
         modified_board = result(board, action)
-        val = max(min_value(modified_board), val)
+        val = max(min_value(modified_board, stats), val)
+    return val
+
+
+def ordered_actions(board, killers=(), first=None):
+    """
+    Returns the candidate cells of a compact board, those on the most
+    winning windows first (center, then corners, then edges on 3x3). Within
+    each class, killer moves (moves that caused a cutoff at the same depth
+    elsewhere in the tree) come first. If given, first leads the list.
+    """
+    rank = board.game.rank
+    return sorted(board.game.candidates(board),
+                  key=lambda cell: (cell != first, rank[cell], cell not in killers, cell))
+
+
+# Kinds of transposition table entries: the stored value is exact, or only
+# a lower or upper bound because the search was cut off
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+# Positions searched by minimax on 3x3, shared between calls
+transpositions = game_for(3).transpositions
+
+
+class SearchTimeout(Exception):
+    """Raised inside a search when its deadline has passed."""
+
+
+def canonical_key(board):
+    """
+    Returns an integer key shared by the board and its rotations and
+    reflections, so equivalent positions share one key.
+    """
+    return encode(board).canonical()
+
+
+assert(canonical_key(winner_row_x) == canonical_key([[X, X, EMPTY], [EMPTY, X, O], [X, X, EMPTY]]))
+assert(canonical_key(winner_row_x) != canonical_key(winner_col_o))
+
+
+def to_table(value, depth):
+    """
+    Makes a win or loss score count plies from the stored position rather
+    than from the root, so it stays valid wherever the position recurs.
+    """
+    if value > WIN // 2:
+        return value + depth
+    if value < -WIN // 2:
+        return value - depth
+    return value
+
+
+def from_table(value, depth):
+    if value > WIN // 2:
+        return value - depth
+    if value < -WIN // 2:
+        return value + depth
+    return value
+
+
+def alpha_beta(board, alpha, beta, depth, killers, stats=None, table=None,
+               horizon=math.inf, deadline=None):
+    """
+    Returns the minimax value of a compact board for X, searching only the
+    part of the tree that can still change the outcome inside the
+    (alpha, beta) window.
+
+    depth counts plies from the root. A win scores WIN minus the plies it
+    takes (a loss the negative), a draw 0. After `horizon` more plies the
+    board is scored by the game's heuristic instead. Raises SearchTimeout
+    once time.monotonic() passes deadline.
+
+    If a table is given, values found for earlier positions (or symmetric
+    copies of them) are reused, and results are stored back with a flag
+    saying whether they are exact or bounds, and the horizon searched.
+    """
+    if stats is not None:
+        stats["nodes"] += 1
+    if deadline is not None and time.monotonic() > deadline:
+        raise SearchTimeout()
+
+    winner = board.winner()
+    if winner == X:
+        return WIN - depth
+    if winner == O:
+        return depth - WIN
+    if board.full():
+        return 0
+    if horizon <= 0:
+        return board.game.evaluate(board)
+
+    original_alpha, original_beta = alpha, beta
+    if table is not None:
+        key = board.canonical()
+        entry = table.get(key)
+        if entry is not None and entry[2] >= horizon:
+            value, flag, _ = entry
+            value = from_table(value, depth)
+            if flag == EXACT:
+                return value
+            if flag == LOWER:
+                alpha = max(alpha, value)
+            else:
+                beta = min(beta, value)
+            if alpha >= beta:
+                return value
+
+    maximizing = board.player() == X
+    val = -math.inf if maximizing else math.inf
+    for action in ordered_actions(board, killers[depth]):
+        child_value = alpha_beta(board.result(action), alpha, beta, depth + 1, killers,
+                                 stats, table, horizon - 1, deadline)
+        if maximizing:
+            val = max(val, child_value)
+            alpha = max(alpha, val)
+        else:
+            val = min(val, child_value)
+            beta = min(beta, val)
+        if alpha >= beta:
+            # Remember the refutation so sibling subtrees try it early
+            killers[depth] = [action] + [k for k in killers[depth] if k != action][:1]
+            break
+
+    if table is not None:
+        if val <= original_alpha:
+            flag = UPPER
+        elif val >= original_beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        table[key] = (to_table(val, depth), flag, horizon)
     return val
 
 
-def minimax(board):
+def search_root(board, killers, stats=None, table=None, horizon=math.inf,
+                deadline=None, first=None):
+    """
+    Returns the best cell for the player to move on a compact board and its
+    value, trying first before the other moves.
+    """
+    maximizing = board.player() == X
+    best_action = None
+    best_value = None
+    alpha, beta = -math.inf, math.inf
+    for action in ordered_actions(board, first=first):
+        value = alpha_beta(board.result(action), alpha, beta, 1, killers,
+                           stats, table, horizon - 1, deadline)
+        if maximizing and value > alpha:
+            alpha = best_value = value
+            best_action = action
+        if not maximizing and value < beta:
+            beta = best_value = value
+            best_action = action
+    return best_action, best_value
+
+
+# Best root value found so far by each parallel search, from the point of
+# view of the player to move. Searches running at the same time on one
+# pool each take their own slot; set in each worker process by init_worker
+shared_bounds = None
+SEARCH_SLOTS = 64
+
+# Process pools for parallel searches, by number of workers
+pools = {}
+pools_lock = threading.Lock()
+
+
+def init_worker(bounds):
+    global shared_bounds
+    shared_bounds = bounds
+
+
+def process_pool(workers):
+    """
+    Returns a process pool of `workers` processes, the bounds they share
+    and a queue of the free bound slots, creating them on first use.
+    """
+    with pools_lock:
+        if workers not in pools:
+            bounds = multiprocessing.Array("d", SEARCH_SLOTS)
+            slots = queue.Queue()
+            for slot in range(SEARCH_SLOTS):
+                slots.put(slot)
+            pool = ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                       initargs=(bounds,))
+            pools[workers] = (pool, bounds, slots)
+        return pools[workers]
+
+
+def search_subtree(x, o, size, length, cell, horizon, deadline, slot):
+    """
+    Searches the root move `cell` in a worker process. Returns its value,
+    whether that value is exact, and the number of positions searched.
+
+    Moves that cannot beat the best value other workers have already found
+    for the same search, kept in bound slot `slot`, are cut off early and
+    come back as inexact upper bounds.
+    """
+    game = game_for(size, length)
+    board = Board(x, o, game)
+    sign = 1 if board.player() == X else -1
+
+    # Scores are integers, so widening the window by one keeps moves that
+    # tie the bound exact and the choice between them the same as serially
+    bound = shared_bounds[slot] - 1
+    if sign == 1:
+        alpha, beta = bound, math.inf
+    else:
+        alpha, beta = -math.inf, -bound
+    stats = {"nodes": 0}
+    value = alpha_beta(board.result(cell), alpha, beta, 1, collections.defaultdict(list),
+                       stats, game.transpositions, horizon - 1, deadline)
+
+    exact = value * sign > bound
+    if exact:
+        with shared_bounds.get_lock():
+            if value * sign > shared_bounds[slot]:
+                shared_bounds[slot] = value * sign
+    return value, exact, stats["nodes"]
+
+
+def parallel_search_root(board, workers, stats=None, horizon=math.inf,
+                         deadline=None, first=None):
+    """
+    Returns the same best cell and value as search_root, searching each
+    root move in its own task on a pool of `workers` processes.
+    """
+    pool, bounds, slots = process_pool(workers)
+    slot = slots.get()
+    bounds[slot] = -math.inf
+    sign = 1 if board.player() == X else -1
+    order = ordered_actions(board, first=first)
+    futures = [pool.submit(search_subtree, board.x, board.o, board.game.size,
+                           board.game.length, cell, horizon, deadline, slot)
+               for cell in order]
+    try:
+        results = [future.result() for future in futures]
+    finally:
+        for future in futures:
+            future.cancel()
+        # Tasks still running write to the slot, so it is only reused
+        # once they are done
+        wait(futures)
+        slots.put(slot)
+
+    # The first exact best value in move order wins, as in search_root
+    best_action = None
+    best_value = None
+    for cell, (value, exact, nodes) in zip(order, results):
+        if stats is not None:
+            stats["nodes"] += nodes
+        if exact and (best_action is None or value * sign > best_value * sign):
+            best_action = cell
+            best_value = value
+    return best_action, best_value
+
+
+def iterative_deepening(board, time_limit=None, max_depth=None, stats=None, table=None,
+                        workers=None):
+    """
+    Returns the best cell on a compact board found by searching one ply
+    deeper at a time until time_limit seconds have passed, max_depth plies
+    were searched or the result is a forced win or loss.
+
+    The first iteration always completes, so there is always a move. With
+    workers, each iteration splits the root moves over that many processes.
+    """
+    deadline = None if time_limit is None else time.monotonic() + time_limit
+    empty = bin(board.game.full & ~(board.x | board.o)).count("1")
+    limit = empty if max_depth is None else min(max_depth, empty)
+    killers = collections.defaultdict(list)
+
+    best_action = None
+    for horizon in range(1, limit + 1):
+        try:
+            if workers:
+                best_action, value = parallel_search_root(
+                    board, workers, stats, horizon,
+                    deadline if best_action is not None else None, best_action
+                )
+            else:
+                best_action, value = search_root(
+                    board, killers, stats, table, horizon,
+                    deadline if best_action is not None else None, best_action
+                )
+        except SearchTimeout:
+            break
+        if stats is not None:
+            stats["depth"] = horizon
+        if abs(value) > WIN // 2:
+            break
+    return best_action
+
+
+# The opening book holds one byte per 3x3 position, indexed by the board
+# read as a base-3 number (empty 0, X 1, O 2): the best cell in the low
+# four bits and the game value + 1 in the high four, or BOOK_EMPTY for
+# positions that are unreachable or already over
+BOOK_MAGIC = b"TTT1"
+BOOK_EMPTY = 0xFF
+BOOK_SIZE = 3 ** 9
+TRITS = [sum(3 ** cell for cell in range(9) if mask >> cell & 1) for mask in range(1 << 9)]
+
+opening_book = None
+
+
+def book_index(board):
+    """
+    Returns the opening book index of a compact 3x3 board.
+    """
+    return TRITS[board.x] + 2 * TRITS[board.o]
+
+
+def load_book(filename):
+    """
+    Loads an opening book written by book.py, so minimax answers 3x3
+    positions from it.
+    """
+    global opening_book
+    with open(filename, "rb") as f:
+        data = f.read()
+    if data[:len(BOOK_MAGIC)] != BOOK_MAGIC or len(data) != len(BOOK_MAGIC) + BOOK_SIZE:
+        raise ValueError(f"{filename} is not a tictactoe opening book")
+    opening_book = data[len(BOOK_MAGIC):]
+
+
+def book_move(board):
+    """
+    Returns the opening book's best cell for a compact board, or None if no
+    book is loaded or it has no entry for the board.
+    """
+    if opening_book is None or board.game is not game_for(3, 3):
+        return None
+    entry = opening_book[book_index(board)]
+    if entry == BOOK_EMPTY:
+        return None
+    return entry & 0x0F
+
+
+def minimax(board, alpha_beta_pruning=True, stats=None, table=None,
+            length=None, time_limit=None, max_depth=None, workers=None):
     """
     Returns the optimal action for the current player on the board.
+
+    With alpha_beta_pruning the search skips subtrees that cannot change the
+    result and caches positions in table (by default the game's shared
+    transposition table); otherwise the full game tree is explored. When an
+    opening book is loaded, 3x3 positions are answered from it directly.
+
+    length is the number of marks in a row that wins, by default the board
+    size. Given a time_limit in seconds or a max_depth in plies, the search
+    deepens iteratively and scores the positions at its horizon
+    heuristically, which is what boards beyond 3x3 need.
+
+    With workers, the root moves are searched in parallel by that many
+    processes, each keeping its own transposition tables; the move chosen
+    is the same as the serial search's.
+
+    If a stats dict is given, stats["nodes"] is set to the number of
+    positions searched (and stats["depth"] to the depth reached when
+    searching iteratively).
     """
-    if terminal(board):
+    if stats is not None:
+        stats["nodes"] = 0
+    if terminal(board, length):
         return None
 
     current_player = player(board)
-    best_utility = 0
+
+    if alpha_beta_pruning:
+        compact = encode(board, length)
+        cell = book_move(compact)
+        if cell is not None:
+            return divmod(cell, len(board))
+        if table is None:
+            table = compact.game.transpositions
+        if time_limit is not None or max_depth is not None:
+            best_action = iterative_deepening(compact, time_limit, max_depth, stats, table, workers)
+        elif workers:
+            best_action, _ = parallel_search_root(compact, workers, stats)
+        else:
+            best_action, _ = search_root(compact, collections.defaultdict(list), stats, table)
+        return divmod(best_action, len(board))
+
+    best_utility = -math.inf if current_player == X else math.inf
     best_action = None
 
+    # After the current player's move it is the opponent's turn to choose
     for action in actions(board):
         modified_board = result(board, action)
         if current_player == X:
-            current_utility = max_value(modified_board)
-            if current_utility >= best_utility:
+            current_utility = min_value(modified_board, stats)
+            if current_utility > best_utility:
                 best_utility = current_utility
                 best_action = action
 
         if current_player == O:
-            current_utility = min_value(modified_board)
-            if current_utility <= best_utility:
+            current_utility = max_value(modified_board, stats)
+            if current_utility < best_utility:
                 best_utility = current_utility
                 best_action = action
 
@@ -1,7 +1,23 @@
+import heapq
 import itertools
+import weakref
 
 
 class Sentence():
+    # Sentences other than And are immutable and hash-consed: building one
+    # equal to a sentence that still exists returns that same object.
+    # Sentences over an And can change with it, so they are mutable: never
+    # shared, and their hash and symbols are cached only until the next
+    # And.add, which bumps the changes counter
+    __slots__ = ("__weakref__",)
+    interned = weakref.WeakValueDictionary()
+    mutable = False
+    changes = 0
+
+    def __getstate__(self):
+        # Sentences are rebuilt from their operands when unpickled; cached
+        # hashes depend on the process's string hashing, so none are kept
+        return None
 
     def evaluate(self, model):
         """Evaluates the logical sentence."""
@@ -13,13 +29,55 @@ class Sentence():
 
     def symbols(self):
         """Returns a set of all symbols in the logical sentence."""
-        return set()
+        return set(self.symbol_set())
+
+    def symbol_set(self):
+        """Returns the symbols in the logical sentence as a frozenset."""
+        return frozenset()
+
+    def compile(self, symbols=None):
+        """Returns the sentence compiled for fast evaluation."""
+        return CompiledSentence(self, symbols)
 
     @classmethod
     def validate(cls, sentence):
         if not isinstance(sentence, Sentence):
             raise TypeError("must be a logical sentence")
 
+    @classmethod
+    def intern(cls, key, operands, *fields):
+        """Returns the existing sentence for key, or a new one with fields set.
+
+        fields alternate names and values, and the hash is computed once
+        from key. If any of operands is mutable, a new mutable sentence is
+        returned, and its hash is computed when first needed.
+        """
+        mutable = False
+        for operand in operands:
+            if operand.mutable:
+                mutable = True
+                break
+        sentence = None if mutable else Sentence.interned.get(key)
+        if sentence is None:
+            sentence = object.__new__(cls)
+            for i in range(0, len(fields), 2):
+                setattr(sentence, fields[i], fields[i + 1])
+            sentence.mutable = mutable
+            sentence.cached_hash = None if mutable else hash(key[1:])
+            sentence.cached_symbols = None
+            sentence.cached_at = Sentence.changes
+            if not mutable:
+                Sentence.interned[key] = sentence
+        return sentence
+
+    def expire_cache(self):
+        """Drops the cached hash and symbols of a mutable sentence if an And
+        has changed since they were computed."""
+        if self.cached_at != Sentence.changes:
+            self.cached_hash = None
+            self.cached_symbols = None
+            self.cached_at = Sentence.changes
+
     @classmethod
     def parenthesize(cls, s):
         """Parenthesizes an expression if not already parenthesized."""
@@ -43,15 +101,20 @@ class Sentence():
 
 
 class Symbol(Sentence):
+    __slots__ = ("name", "mutable", "cached_hash", "cached_symbols",
+                 "cached_at")
+
+    def __new__(cls, name):
+        return cls.intern((cls, "symbol", name), (), "name", name)
 
-    def __init__(self, name):
-        self.name = name
+    def __getnewargs__(self):
+        return (self.name,)
 
     def __eq__(self, other):
-        return isinstance(other, Symbol) and self.name == other.name
+        return self is other or (isinstance(other, Symbol) and self.name == other.name)
 
     def __hash__(self):
-        return hash(("symbol", self.name))
+        return self.cached_hash
 
     def __repr__(self):
         return self.name
@@ -65,20 +128,34 @@ class Symbol(Sentence):
     def formula(self):
         return self.name
 
-    def symbols(self):
-        return {self.name}
+    def symbol_set(self):
+        if self.cached_symbols is None:
+            self.cached_symbols = frozenset((self.name,))
+        return self.cached_symbols
 
 
 class Not(Sentence):
-    def __init__(self, operand):
+    __slots__ = ("operand", "mutable", "cached_hash", "cached_symbols",
+                 "cached_at")
+
+    def __new__(cls, operand):
         Sentence.validate(operand)
-        self.operand = operand
+        return cls.intern((cls, "not", operand), (operand,), "operand", operand)
+
+    def __getnewargs__(self):
+        return (self.operand,)
 
     def __eq__(self, other):
-        return isinstance(other, Not) and self.operand == other.operand
+        return self is other or (isinstance(other, Not)
+                                 and hash(self) == hash(other)
+                                 and self.operand == other.operand)
 
     def __hash__(self):
-        return hash(("not", hash(self.operand)))
+        if self.mutable:
+            self.expire_cache()
+            if self.cached_hash is None:
+                self.cached_hash = hash(("not", self.operand))
+        return self.cached_hash
 
     def __repr__(self):
         return f"Not({self.operand})"
@@ -89,23 +166,42 @@ class Not(Sentence):
     def formula(self):
         return "¬" + Sentence.parenthesize(self.operand.formula())
 
-    def symbols(self):
-        return self.operand.symbols()
+    def symbol_set(self):
+        if self.mutable:
+            self.expire_cache()
+        if self.cached_symbols is None:
+            self.cached_symbols = self.operand.symbol_set()
+        return self.cached_symbols
 
 
 class And(Sentence):
+    # Conjunctions can grow with add, so they are not shared
+    __slots__ = ("conjuncts", "cached_hash", "cached_symbols", "cached_at")
+    mutable = True
+
     def __init__(self, *conjuncts):
         for conjunct in conjuncts:
             Sentence.validate(conjunct)
         self.conjuncts = list(conjuncts)
+        self.cached_hash = None
+        self.cached_symbols = None
+        self.cached_at = Sentence.changes
+
+    def __reduce__(self):
+        return (And, tuple(self.conjuncts))
 
     def __eq__(self, other):
-        return isinstance(other, And) and self.conjuncts == other.conjuncts
+        return self is other or (isinstance(other, And)
+                                 and hash(self) == hash(other)
+                                 and self.conjuncts == other.conjuncts)
 
     def __hash__(self):
-        return hash(
-            ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
-        )
+        self.expire_cache()
+        if self.cached_hash is None:
+            self.cached_hash = hash(
+                ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
+            )
+        return self.cached_hash
 
     def __repr__(self):
         conjunctions = ", ".join(
@@ -116,6 +212,9 @@ class And(Sentence):
     def add(self, conjunct):
         Sentence.validate(conjunct)
         self.conjuncts.append(conjunct)
+        Sentence.changes += 1
+        self.cached_hash = None
+        self.cached_symbols = None
 
     def evaluate(self, model):
         return all(conjunct.evaluate(model) for conjunct in self.conjuncts)
@@ -126,23 +225,39 @@ class And(Sentence):
         return " ∧ ".join([Sentence.parenthesize(conjunct.formula())
                            for conjunct in self.conjuncts])
 
-    def symbols(self):
-        return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
+    def symbol_set(self):
+        self.expire_cache()
+        if self.cached_symbols is None:
+            self.cached_symbols = frozenset().union(
+                *[conjunct.symbol_set() for conjunct in self.conjuncts]
+            )
+        return self.cached_symbols
 
 
 class Or(Sentence):
-    def __init__(self, *disjuncts):
+    __slots__ = ("disjuncts", "mutable", "cached_hash", "cached_symbols",
+                 "cached_at")
+
+    def __new__(cls, *disjuncts):
         for disjunct in disjuncts:
             Sentence.validate(disjunct)
-        self.disjuncts = list(disjuncts)
+        return cls.intern((cls, "or", disjuncts), disjuncts,
+                          "disjuncts", list(disjuncts))
+
+    def __getnewargs__(self):
+        return tuple(self.disjuncts)
 
     def __eq__(self, other):
-        return isinstance(other, Or) and self.disjuncts == other.disjuncts
+        return self is other or (isinstance(other, Or)
+                                 and hash(self) == hash(other)
+                                 and self.disjuncts == other.disjuncts)
 
     def __hash__(self):
-        return hash(
-            ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
-        )
+        if self.mutable:
+            self.expire_cache()
+            if self.cached_hash is None:
+                self.cached_hash = hash(("or", tuple(self.disjuncts)))
+        return self.cached_hash
 
     def __repr__(self):
         disjuncts = ", ".join([str(disjunct) for disjunct in self.disjuncts])
@@ -157,24 +272,42 @@ class Or(Sentence):
         return " ∨  ".join([Sentence.parenthesize(disjunct.formula())
                             for disjunct in self.disjuncts])
 
-    def symbols(self):
-        return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
+    def symbol_set(self):
+        if self.mutable:
+            self.expire_cache()
+        if self.cached_symbols is None:
+            self.cached_symbols = frozenset().union(
+                *[disjunct.symbol_set() for disjunct in self.disjuncts]
+            )
+        return self.cached_symbols
 
 
 class Implication(Sentence):
-    def __init__(self, antecedent, consequent):
+    __slots__ = ("antecedent", "consequent", "mutable", "cached_hash", "cached_symbols",
+                 "cached_at")
+
+    def __new__(cls, antecedent, consequent):
         Sentence.validate(antecedent)
         Sentence.validate(consequent)
-        self.antecedent = antecedent
-        self.consequent = consequent
+        return cls.intern((cls, "implies", antecedent, consequent),
+                          (antecedent, consequent),
+                          "antecedent", antecedent, "consequent", consequent)
+
+    def __getnewargs__(self):
+        return (self.antecedent, self.consequent)
 
     def __eq__(self, other):
-        return (isinstance(other, Implication)
-                and self.antecedent == other.antecedent
-                and self.consequent == other.consequent)
+        return self is other or (isinstance(other, Implication)
+                                 and hash(self) == hash(other)
+                                 and self.antecedent == other.antecedent
+                                 and self.consequent == other.consequent)
 
     def __hash__(self):
-        return hash(("implies", hash(self.antecedent), hash(self.consequent)))
+        if self.mutable:
+            self.expire_cache()
+            if self.cached_hash is None:
+                self.cached_hash = hash(("implies", self.antecedent, self.consequent))
+        return self.cached_hash
 
     def __repr__(self):
         return f"Implication({self.antecedent}, {self.consequent})"
@@ -188,24 +321,39 @@ class Implication(Sentence):
         consequent = Sentence.parenthesize(self.consequent.formula())
         return f"{antecedent} => {consequent}"
 
-    def symbols(self):
-        return set.union(self.antecedent.symbols(), self.consequent.symbols())
+    def symbol_set(self):
+        if self.mutable:
+            self.expire_cache()
+        if self.cached_symbols is None:
+            self.cached_symbols = self.antecedent.symbol_set() | self.consequent.symbol_set()
+        return self.cached_symbols
 
 
 class Biconditional(Sentence):
-    def __init__(self, left, right):
+    __slots__ = ("left", "right", "mutable", "cached_hash", "cached_symbols",
+                 "cached_at")
+
+    def __new__(cls, left, right):
         Sentence.validate(left)
         Sentence.validate(right)
-        self.left = left
-        self.right = right
+        return cls.intern((cls, "biconditional", left, right), (left, right),
+                          "left", left, "right", right)
+
+    def __getnewargs__(self):
+        return (self.left, self.right)
 
     def __eq__(self, other):
-        return (isinstance(other, Biconditional)
-                and self.left == other.left
-                and self.right == other.right)
+        return self is other or (isinstance(other, Biconditional)
+                                 and hash(self) == hash(other)
+                                 and self.left == other.left
+                                 and self.right == other.right)
 
     def __hash__(self):
-        return hash(("biconditional", hash(self.left), hash(self.right)))
+        if self.mutable:
+            self.expire_cache()
+            if self.cached_hash is None:
+                self.cached_hash = hash(("biconditional", self.left, self.right))
+        return self.cached_hash
 
     def __repr__(self):
         return f"Biconditional({self.left}, {self.right})"
@@ -221,12 +369,561 @@ class Biconditional(Sentence):
         right = Sentence.parenthesize(str(self.right))
         return f"{left} <=> {right}"
 
-    def symbols(self):
-        return set.union(self.left.symbols(), self.right.symbols())
+    def symbol_set(self):
+        if self.mutable:
+            self.expire_cache()
+        if self.cached_symbols is None:
+            self.cached_symbols = self.left.symbol_set() | self.right.symbol_set()
+        return self.cached_symbols
+
+
+class CompiledSentence():
+    """Sentence lowered to straight-line Python code over symbol indices.
+
+    Every distinct subsentence becomes one assignment of bitwise operations
+    in a generated function, called with one value per symbol (in the
+    order of self.symbols) and a mask of all true bits. With bools and a
+    mask of 1 it evaluates one model; with integers it evaluates one model
+    per bit at once, and NumPy bool arrays with a mask of True work too.
+    """
+
+    def __init__(self, sentence, symbols=None):
+        if symbols is None:
+            symbols = sorted(sentence.symbols())
+        self.symbols = list(symbols)
+        self.index = {name: i for i, name in enumerate(self.symbols)}
+        self.lines = []
+        self.names = {}
+        result = self.lower(sentence)
+        source = "def function(v, mask):\n"
+        source += "".join(f"    {line}\n" for line in self.lines)
+        source += f"    return {result}\n"
+        namespace = {}
+        exec(source, namespace)
+        self.source = source
+        self.function = namespace["function"]
+
+    def lower(self, sentence):
+        """Returns the expression for sentence, emitting lines it depends on."""
+        if isinstance(sentence, Symbol):
+            try:
+                return f"v[{self.index[sentence.name]}]"
+            except KeyError:
+                raise Exception(f"variable {sentence.name} not in symbols")
+        if sentence in self.names:
+            return self.names[sentence]
+
+        if isinstance(sentence, Not):
+            expression = f"mask ^ {self.lower(sentence.operand)}"
+        elif isinstance(sentence, And):
+            operands = [self.lower(c) for c in sentence.conjuncts]
+            expression = " & ".join(operands) if operands else "mask"
+        elif isinstance(sentence, Or):
+            operands = [self.lower(d) for d in sentence.disjuncts]
+            expression = " | ".join(operands) if operands else "0"
+        elif isinstance(sentence, Implication):
+            antecedent = self.lower(sentence.antecedent)
+            consequent = self.lower(sentence.consequent)
+            expression = f"(mask ^ {antecedent}) | {consequent}"
+        elif isinstance(sentence, Biconditional):
+            left = self.lower(sentence.left)
+            right = self.lower(sentence.right)
+            expression = f"mask ^ {left} ^ {right}"
+        else:
+            raise TypeError(f"cannot compile {sentence}")
 
+        name = f"t{len(self.lines)}"
+        self.lines.append(f"{name} = {expression}")
+        self.names[sentence] = name
+        return name
 
-def model_check(knowledge, query):
-    """Checks if knowledge base entails query."""
+    def evaluate(self, model):
+        """Evaluates the sentence in one model."""
+        return bool(self.function([model[name] for name in self.symbols], 1))
+
+    def evaluate_bits(self, columns, mask):
+        """Evaluates many models at once; bit r of columns[i] is symbol i in model r.
+
+        Returns the integer whose bit r is the sentence's value in model r.
+        """
+        return self.function(columns, mask)
+
+
+def bit_columns(count):
+    """Returns the columns of `count` symbols over all 2^count models.
+
+    Bit r of column i is bit i of r, and mask has all 2^count bits set.
+    """
+    rows = 1 << count
+    mask = (1 << rows) - 1
+    columns = []
+    for i in range(count):
+        period = 2 << i
+        # Ones in the upper half of each period, repeated across all rows
+        unit = ((1 << (1 << i)) - 1) << (1 << i)
+        columns.append(unit * (mask // ((1 << period) - 1)))
+    return columns, mask
+
+
+class CNF():
+    """Clauses over integer literals: variable v is v, its negation -v.
+
+    Sentences are converted with the Tseitin transformation: every
+    connective gets a fresh variable defined to be equivalent to it, so the
+    clauses grow linearly with the sentence instead of exponentially.
+    """
+
+    def __init__(self):
+        self.variables = {}
+        self.names = [None]
+        self.definitions = {}
+        self.clauses = []
+
+    def variable(self, name=None):
+        """Returns the variable of a symbol name, or a fresh one for None."""
+        if name is not None and name in self.variables:
+            return self.variables[name]
+        v = len(self.names)
+        self.names.append(name)
+        if name is not None:
+            self.variables[name] = v
+        return v
+
+    def literal(self, sentence):
+        """Returns a literal equivalent to sentence, defining it if needed."""
+        if isinstance(sentence, Symbol):
+            return self.variable(sentence.name)
+        if isinstance(sentence, Not):
+            return -self.literal(sentence.operand)
+        if sentence in self.definitions:
+            return self.definitions[sentence]
+
+        if isinstance(sentence, And):
+            operands = [self.literal(c) for c in sentence.conjuncts]
+            g = self.variable()
+            self.clauses.extend([-g, l] for l in operands)
+            self.clauses.append([g] + [-l for l in operands])
+        elif isinstance(sentence, Or):
+            operands = [self.literal(d) for d in sentence.disjuncts]
+            g = self.variable()
+            self.clauses.extend([g, -l] for l in operands)
+            self.clauses.append([-g] + operands)
+        elif isinstance(sentence, Implication):
+            a = self.literal(sentence.antecedent)
+            b = self.literal(sentence.consequent)
+            g = self.variable()
+            self.clauses.extend([[-g, -a, b], [g, a], [g, -b]])
+        elif isinstance(sentence, Biconditional):
+            a = self.literal(sentence.left)
+            b = self.literal(sentence.right)
+            g = self.variable()
+            self.clauses.extend([[-g, -a, b], [-g, a, -b], [g, a, b], [g, -a, -b]])
+        else:
+            raise TypeError(f"cannot convert {sentence} to CNF")
+
+        self.definitions[sentence] = g
+        return g
+
+    def add(self, sentence):
+        """Adds clauses that hold exactly when sentence is true."""
+        if isinstance(sentence, And):
+            for conjunct in sentence.conjuncts:
+                self.add(conjunct)
+        elif isinstance(sentence, Or):
+            self.clauses.append([self.literal(d) for d in sentence.disjuncts])
+        elif isinstance(sentence, Not) and isinstance(sentence.operand, And):
+            self.clauses.append([-self.literal(c) for c in sentence.operand.conjuncts])
+        else:
+            self.clauses.append([self.literal(sentence)])
+
+
+class Solver():
+    """CDCL satisfiability solver over the clauses of a CNF.
+
+    Propagates units with two watched literals per clause, learns a clause
+    from every conflict (first unique implication point) and jumps back to
+    the level where it becomes unit. Decisions follow variable activity,
+    which is bumped for variables involved in recent conflicts.
+    """
+
+    def __init__(self, cnf):
+        self.cnf = cnf
+        self.clauses = []
+        self.watches = {}
+        self.assignment = [None]
+        self.level = [0]
+        self.reason = [None]
+        self.activity = [0.0]
+        self.polarity = [False]
+        self.trail = []
+        self.trail_levels = []
+        self.head = 0
+        self.bump = 1.0
+        self.heap = []
+        self.ok = True
+        self.added = 0
+        self.conflicts = 0
+        self.decisions = 0
+        self.update()
+
+    def update(self):
+        """Takes in variables and clauses added to the CNF since last time."""
+        for v in range(len(self.assignment), len(self.cnf.names)):
+            self.assignment.append(None)
+            self.level.append(0)
+            self.reason.append(None)
+            self.activity.append(0.0)
+            self.polarity.append(False)
+            self.watches[v] = []
+            self.watches[-v] = []
+            heapq.heappush(self.heap, (0.0, v))
+        clauses = self.cnf.clauses
+        while self.added < len(clauses):
+            self.add_clause(clauses[self.added])
+            self.added += 1
+
+    def value(self, literal):
+        value = self.assignment[abs(literal)]
+        if value is None:
+            return None
+        return value == (literal > 0)
+
+    def add_clause(self, clause):
+        """Adds a clause at decision level 0."""
+        if not self.ok:
+            return
+        literals = []
+        for literal in clause:
+            value = self.value(literal)
+            if value or -literal in literals:
+                return
+            if value is None and literal not in literals:
+                literals.append(literal)
+        if not literals:
+            self.ok = False
+        elif len(literals) == 1:
+            self.enqueue(literals[0], None)
+            self.ok = self.propagate() is None
+        else:
+            self.attach(literals)
+
+    def attach(self, clause):
+        """Stores a clause and watches its first two literals."""
+        self.clauses.append(clause)
+        index = len(self.clauses) - 1
+        self.watches[clause[0]].append(index)
+        self.watches[clause[1]].append(index)
+        return index
+
+    def enqueue(self, literal, reason):
+        v = abs(literal)
+        self.assignment[v] = literal > 0
+        self.level[v] = len(self.trail_levels)
+        self.reason[v] = reason
+        self.trail.append(literal)
+
+    def propagate(self):
+        """Assigns every literal forced by a unit clause.
+
+        Returns the index of a clause with all literals false, or None.
+        """
+        clauses = self.clauses
+        watches = self.watches
+        assignment = self.assignment
+        trail = self.trail
+        while self.head < len(trail):
+            false_literal = -trail[self.head]
+            self.head += 1
+            watching = watches[false_literal]
+            watches[false_literal] = kept = []
+            for n, index in enumerate(watching):
+                clause = clauses[index]
+                if clause[0] == false_literal:
+                    clause[0], clause[1] = clause[1], false_literal
+                first = clause[0]
+                value = assignment[abs(first)]
+                if value is not None and value == (first > 0):
+                    kept.append(index)
+                    continue
+
+                # Look for another literal that is not false to watch
+                for k in range(2, len(clause)):
+                    literal = clause[k]
+                    value = assignment[abs(literal)]
+                    if value is None or value == (literal > 0):
+                        clause[1], clause[k] = literal, false_literal
+                        watches[literal].append(index)
+                        break
+                else:
+                    kept.append(index)
+                    if assignment[abs(first)] is not None:
+                        kept.extend(watching[n + 1:])
+                        return index
+                    self.enqueue(first, index)
+        return None
+
+    def analyze(self, conflict):
+        """Returns the learned clause for a conflict and the level to jump to.
+
+        The clause's first literal is the one it asserts after the jump.
+        """
+        level = len(self.trail_levels)
+        learned = [None]
+        seen = set()
+        pending = 0
+        literal = None
+        i = len(self.trail) - 1
+        clause = self.clauses[conflict]
+        while True:
+            for q in (clause if literal is None else clause[1:]):
+                v = abs(q)
+                if v not in seen and self.level[v] > 0:
+                    seen.add(v)
+                    self.bump_activity(v)
+                    if self.level[v] == level:
+                        pending += 1
+                    else:
+                        learned.append(q)
+
+            # The most recently assigned literal involved in the conflict
+            while abs(self.trail[i]) not in seen:
+                i -= 1
+            literal = self.trail[i]
+            i -= 1
+            pending -= 1
+            if not pending:
+                break
+            clause = self.clauses[self.reason[abs(literal)]]
+
+        learned[0] = -literal
+        jump = 0
+        if len(learned) > 1:
+            deepest = max(range(1, len(learned)), key=lambda k: self.level[abs(learned[k])])
+            learned[1], learned[deepest] = learned[deepest], learned[1]
+            jump = self.level[abs(learned[1])]
+        return learned, jump
+
+    def bump_activity(self, v):
+        self.activity[v] += self.bump
+        if self.activity[v] > 1e100:
+            self.activity = [a * 1e-100 for a in self.activity]
+            self.bump *= 1e-100
+            self.heap = [(-a, v) for v, a in enumerate(self.activity) if v]
+            heapq.heapify(self.heap)
+        else:
+            heapq.heappush(self.heap, (-self.activity[v], v))
+
+    def backtrack(self, level):
+        """Undoes every assignment made above decision level `level`."""
+        if len(self.trail_levels) <= level:
+            return
+        start = self.trail_levels[level]
+        for literal in self.trail[start:]:
+            v = abs(literal)
+            self.polarity[v] = literal > 0
+            self.assignment[v] = None
+            self.reason[v] = None
+            heapq.heappush(self.heap, (-self.activity[v], v))
+        del self.trail[start:]
+        del self.trail_levels[level:]
+        self.head = start
+
+    def decide(self):
+        """Returns the unassigned variable with the highest activity, or None."""
+        while self.heap:
+            _, v = heapq.heappop(self.heap)
+            if self.assignment[v] is None:
+                return v
+        return None
+
+    def solve(self, assumptions=()):
+        """Returns True if the clauses are satisfiable, leaving a model assigned.
+
+        assumptions are literals taken as true for this call only; clauses
+        learned meanwhile still hold without them and are kept.
+        """
+        self.backtrack(0)
+        self.update()
+        if not self.ok:
+            return False
+        restart = 100
+        conflicts = 0
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                self.conflicts += 1
+                conflicts += 1
+                if not self.trail_levels:
+                    self.ok = False
+                    return False
+                learned, jump = self.analyze(conflict)
+                self.backtrack(jump)
+                if len(learned) == 1:
+                    self.enqueue(learned[0], None)
+                else:
+                    self.enqueue(learned[0], self.attach(learned))
+                self.bump /= 0.95
+                continue
+
+            if conflicts >= restart:
+                conflicts = 0
+                restart = int(restart * 1.5)
+                self.backtrack(0)
+                continue
+
+            # Assumptions are the first decisions, one level each
+            if len(self.trail_levels) < len(assumptions):
+                literal = assumptions[len(self.trail_levels)]
+                value = self.value(literal)
+                if value is False:
+                    self.backtrack(0)
+                    return False
+                self.trail_levels.append(len(self.trail))
+                if value is None:
+                    self.enqueue(literal, None)
+                continue
+
+            v = self.decide()
+            if v is None:
+                return True
+            self.decisions += 1
+            self.trail_levels.append(len(self.trail))
+            self.enqueue(v if self.polarity[v] else -v, None)
+
+    def model(self):
+        """Returns the symbol assignment of the last satisfying model."""
+        return {name: bool(self.assignment[v])
+                for name, v in self.cnf.variables.items()}
+
+
+ENTAILED = "entailed"
+REFUTED = "refuted"
+UNKNOWN = "unknown"
+
+
+class KnowledgeBase():
+    """Knowledge that answers many queries with one incremental solver.
+
+    The CNF of everything told and the clauses the solver learns are kept
+    between queries; each query is answered by solving under the
+    assumption that it is false.
+    """
+
+    def __init__(self, *sentences):
+        self.cnf = CNF()
+        self.solver = Solver(self.cnf)
+        for sentence in sentences:
+            self.tell(sentence)
+
+    def tell(self, sentence):
+        """Adds sentence to the knowledge base."""
+        Sentence.validate(sentence)
+        self.cnf.add(sentence)
+
+    def ask(self, query):
+        """Checks if the knowledge base entails query."""
+        return not self.solver.solve([-self.cnf.literal(query)])
+
+    def ask_all(self, queries):
+        """Returns {query: ENTAILED, REFUTED or UNKNOWN} for every query.
+
+        Every model found rules out both answers for the queries it makes
+        true and false, so most queries take no solving of their own.
+        """
+        literals = {query: self.cnf.literal(query) for query in queries}
+        if not self.solver.solve():
+            return {query: ENTAILED for query in queries}
+
+        # Values each query has taken in some model of the knowledge
+        seen = {query: set() for query in queries}
+
+        def record():
+            for query, literal in literals.items():
+                seen[query].add(self.solver.value(literal))
+
+        record()
+        answers = {}
+        for query, literal in literals.items():
+            while query not in answers:
+                if len(seen[query]) == 2:
+                    answers[query] = UNKNOWN
+                elif True in seen[query]:
+                    if self.solver.solve([-literal]):
+                        record()
+                    else:
+                        answers[query] = ENTAILED
+                else:
+                    if self.solver.solve([literal]):
+                        record()
+                    else:
+                        answers[query] = REFUTED
+        return answers
+
+
+def sat_check(knowledge, query):
+    """Checks if knowledge base entails query: knowledge ∧ ¬query is unsatisfiable."""
+    return KnowledgeBase(knowledge).ask(query)
+
+
+def bitmask_check(knowledge, query, block=12):
+    """Checks if knowledge base entails query, 2^block models at a time.
+
+    knowledge ∧ ¬query is compiled and evaluated bit-parallel over every
+    assignment of up to `block` symbols at once, for each assignment of
+    the rest; any set bit is a model where the query fails.
+    """
+    symbols = sorted(set.union(knowledge.symbols(), query.symbols()))
+    counterexample = And(knowledge, Not(query)).compile(symbols)
+    inner = min(block, len(symbols))
+    columns, mask = bit_columns(inner)
+    outer = len(symbols) - inner
+    for assignment in range(1 << outer):
+        values = columns + [mask if assignment >> i & 1 else 0 for i in range(outer)]
+        if counterexample.evaluate_bits(values, mask):
+            return False
+    return True
+
+
+def numpy_check(knowledge, query, memory=64 * 2 ** 20):
+    """Checks if knowledge base entails query with NumPy over blocks of models.
+
+    Models are packed 64 to a uint64 word: the first k symbols become
+    columns of words covering all 2^k of their assignments, with k as
+    large as lets the compiled knowledge ∧ ¬query keep all its
+    intermediate columns within `memory` bytes. The block is evaluated
+    once per assignment of the other symbols.
+    """
+    import numpy as np
+
+    symbols = sorted(set.union(knowledge.symbols(), query.symbols()))
+    counterexample = And(knowledge, Not(query)).compile(symbols)
+    arrays = len(counterexample.lines) + len(symbols)
+    inner = min(6, len(symbols))
+    while inner < len(symbols) and (2 << inner) // 8 * arrays <= memory:
+        inner += 1
+
+    # Within a word, bit r is model r of the low six symbols; the higher
+    # inner symbols vary from word to word
+    ones = np.uint64(2 ** 64 - 1)
+    words = np.arange(1 << max(0, inner - 6))
+    columns = []
+    for i in range(inner):
+        if i < 6:
+            bits = sum(1 << r for r in range(64) if r >> i & 1)
+            columns.append(np.full(len(words), bits, dtype=np.uint64))
+        else:
+            columns.append(np.where(words >> (i - 6) & 1, ones, np.uint64(0)))
+
+    outer = len(symbols) - inner
+    for assignment in range(1 << outer):
+        values = columns + [ones if assignment >> i & 1 else np.uint64(0) for i in range(outer)]
+        if np.any(counterexample.evaluate_bits(values, ones)):
+            return False
+    return True
+
+
+def truth_table_check(knowledge, query):
+    """Checks if knowledge base entails query by enumerating every model."""
 
     def check_all(knowledge, query, symbols, model):
         """Checks if knowledge base entails query, given a particular model."""
@@ -261,3 +958,27 @@ def model_check(knowledge, query):
 
     # Check that knowledge entails query
     return check_all(knowledge, query, symbols, dict())
+
+
+MODEL_CHECKERS = {
+    "sat": sat_check,
+    "bitmask": bitmask_check,
+    "numpy": numpy_check,
+    "truth-table": truth_table_check,
+}
+
+
+def model_check(knowledge, query, backend="sat"):
+    """Checks if knowledge base entails query.
+
+    backend selects the method: "sat" (the default) refutes knowledge ∧
+    ¬query with a CDCL solver, "bitmask" checks all 2^n models with a
+    compiled bit-parallel sentence, "numpy" does the same over bool arrays
+    and "truth-table" checks them one by one.
+    """
+    try:
+        checker = MODEL_CHECKERS[backend]
+    except KeyError:
+        raise ValueError(f"unknown model checking backend {backend}")
+    return checker(knowledge, query)
+
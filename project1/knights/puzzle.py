@@ -98,8 +98,9 @@ def main():
         if len(knowledge.conjuncts) == 0:
             print("    Not yet implemented.")
         else:
+            answers = KnowledgeBase(knowledge).ask_all(symbols)
             for symbol in symbols:
-                if model_check(knowledge, symbol):
+                if answers[symbol] == ENTAILED:
                     print(f"    {symbol}")
 
 